@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Load test: gunicorn sync workers (server:app) vs the ASGI mode (server:asgi_app).
+
+Each mode is started in a child process with yt-dlp extraction replaced by a
+stub that sleeps for a fixed upstream latency, like a slow YouTube response.
+Every request asks /api/metadata about a different video, so none of them hit
+the cache. The client keeps C requests in flight and reports throughput and
+latency percentiles.
+  - sync: gunicorn, 4 sync workers (the Dockerfile default)
+  - asgi: uvicorn, a single process with VOXTEXT_ASGI_THREADS handler threads
+
+Usage: python Backend/benchmarks/bench_asgi_load.py [requests] [concurrency] [latency_s]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PORTS = {"sync": 5071, "asgi": 5072}
+
+
+def serve(mode, port, latency):
+    sys.path.insert(0, BACKEND_DIR)
+    import server
+
+    def slow_extract(url):
+        time.sleep(latency)
+        info = {"id": server._extract_video_id(url), "title": "Benchmark video", "duration": 60,
+                "channel": "Benchmark channel"}
+        return server.VideoSummary.from_info(info).to_dict()
+
+    server._extract_info_uncached = slow_extract
+    server._extract_lite_info_uncached = slow_extract
+
+    if mode == "asgi":
+        import uvicorn
+        uvicorn.run(server.asgi_app, host="127.0.0.1", port=port, log_level="warning")
+        return
+
+    from gunicorn.app.base import BaseApplication
+
+    class App(BaseApplication):
+        def load_config(self):
+            for key, value in {"bind": f"127.0.0.1:{port}", "workers": 4, "timeout": 120,
+                               "loglevel": "warning"}.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return server.app
+
+    App().run()
+
+
+def wait_ready(port, deadline=30):
+    started = time.time()
+    while time.time() - started < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def fetch(port, i):
+    started = time.perf_counter()
+    url = f"http://127.0.0.1:{port}/api/metadata?url=https://youtu.be/bench{i:06d}"
+    try:
+        with urllib.request.urlopen(url, timeout=120) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return time.perf_counter() - started, status
+
+
+def load(mode, requests_total, concurrency, latency):
+    port = PORTS[mode]
+    env = dict(os.environ, VOXTEXT_CACHE_DIR=tempfile.mkdtemp(prefix=f"voxtext-bench-{mode}-"),
+               VOXTEXT_YTDL_PREWARM="0")
+    proc = subprocess.Popen([sys.executable, __file__, "--serve", mode, str(port), str(latency)], env=env)
+    try:
+        wait_ready(port)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda i: fetch(port, i), range(requests_total)))
+        elapsed = time.perf_counter() - started
+    finally:
+        proc.terminate()
+        proc.wait()
+    latencies = sorted(latency_s for latency_s, status in results if status == 200)
+    errors = len(results) - len(latencies)
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else float("nan")
+
+    print(f"{mode:>5}: {requests_total / elapsed:7.1f} req/s  p50 {pct(0.5):7.0f} ms  p95 {pct(0.95):7.0f} ms"
+          f"  p99 {pct(0.99):7.0f} ms  errors {errors}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        serve(sys.argv[2], int(sys.argv[3]), float(sys.argv[4]))
+        return
+    requests_total = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.25
+    print(f"{requests_total} requests, {concurrency} in flight, {latency * 1000:.0f} ms simulated upstream latency")
+    for mode in ("sync", "asgi"):
+        load(mode, requests_total, concurrency, latency)
+
+
+if __name__ == "__main__":
+    main()
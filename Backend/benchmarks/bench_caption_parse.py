@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Benchmark: caption parsing throughput and peak memory, before and after.
+
+Builds large json3, VTT and SRV3 fixtures (a multi-hour lecture with word-level
+timing), then compares the old whole-document `_parse_caption_content` (copied
+below) with the streaming `iter_caption_segments` fed 64 KB byte chunks, as it
+would be when reading a response. SRV3 has no "before" (the old parser could
+not read it).
+
+Usage: python Backend/benchmarks/bench_caption_parse.py [hours]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("VOXTEXT_CACHE_DIR", tempfile.mkdtemp(prefix="voxtext-bench-"))
+
+import server  # noqa: E402
+
+
+def old_parse_caption_content(raw):
+    segments = []
+    try:
+        caption_data = json.loads(raw)
+        events = caption_data.get("events", [])
+        for event in events:
+            start_ms = event.get("tStartMs", 0)
+            dur_ms = event.get("dDurMs", 0)
+            segs = event.get("segs")
+            if not segs:
+                continue
+            text = "".join(s.get("utf8", "") for s in segs).strip()
+            text = text.replace("\n", " ")
+            if not text:
+                continue
+            segments.append({"startMs": start_ms, "endMs": start_ms + dur_ms, "text": text})
+    except (json.JSONDecodeError, KeyError):
+        lines = raw.strip().split("\n")
+        i = 0
+        while i < len(lines):
+            line = lines[i].strip()
+            if "-->" in line:
+                parts = line.split("-->")
+                start_str = parts[0].strip()
+                end_str = parts[1].strip().split(" ")[0]
+
+                def vtt_to_ms(ts):
+                    ts_parts = ts.replace(",", ".").split(":")
+                    if len(ts_parts) == 3:
+                        h, m, rest = ts_parts
+                        s_parts = rest.split(".")
+                        s = s_parts[0]
+                        ms = s_parts[1] if len(s_parts) > 1 else "0"
+                    elif len(ts_parts) == 2:
+                        h = "0"
+                        m = ts_parts[0]
+                        rest = ts_parts[1]
+                        s_parts = rest.split(".")
+                        s = s_parts[0]
+                        ms = s_parts[1] if len(s_parts) > 1 else "0"
+                    else:
+                        return 0
+                    return (int(h) * 3600 + int(m) * 60 + int(s)) * 1000 + int(ms.ljust(3, "0")[:3])
+
+                start_ms = vtt_to_ms(start_str)
+                end_ms = vtt_to_ms(end_str)
+                text_lines = []
+                i += 1
+                while i < len(lines) and lines[i].strip():
+                    text_lines.append(lines[i].strip())
+                    i += 1
+                text = " ".join(text_lines)
+                if text:
+                    segments.append({"startMs": start_ms, "endMs": end_ms, "text": text})
+            i += 1
+    return segments
+
+
+WORDS = ("so the derivative of this function is what we call the slope and that "
+         "gives us தமிழ் 日本語 über naïve équation").split()
+
+
+def make_cues(hours, rng):
+    cues = []
+    t = 0
+    while t < hours * 3600 * 1000:
+        words = rng.choices(WORDS, k=rng.randint(3, 9))
+        dur = rng.randint(1200, 4000)
+        cues.append((t, dur, words))
+        t += dur
+    return cues
+
+
+def make_json3(cues):
+    events = [{"tStartMs": 0, "dDurMs": cues[-1][0], "id": 1, "wpWinPosId": 1, "wsWinStyleId": 1}]
+    for start, dur, words in cues:
+        segs = [{"utf8": words[0]}] + [{"utf8": " " + w, "tOffsetMs": 120 * i, "acAsrConf": 0}
+                                        for i, w in enumerate(words[1:], 1)]
+        events.append({"tStartMs": start, "dDurMs": dur, "wWinId": 1, "segs": segs})
+        events.append({"tStartMs": start + dur - 10, "dDurMs": 10, "wWinId": 1, "aAppend": 1,
+                       "segs": [{"utf8": "\n"}]})
+    return json.dumps({"wireMagic": "pb3", "pens": [{}], "wsWinStyles": [{}], "wpWinPositions": [{}],
+                       "events": events}, ensure_ascii=False)
+
+
+def fmt_ts(ms):
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}"
+
+
+def make_vtt(cues):
+    out = ["WEBVTT", "Kind: captions", "Language: en", ""]
+    for start, dur, words in cues:
+        out += [f"{fmt_ts(start)} --> {fmt_ts(start + dur)} align:start position:0%",
+                " ".join(words[:4]), " ".join(words[4:]) or ".", ""]
+    return "\n".join(out)
+
+
+def make_srv3(cues):
+    out = ['<?xml version="1.0" encoding="utf-8" ?><timedtext format="3"><body>']
+    for start, dur, words in cues:
+        out.append(f'<p t="{start}" d="{dur}" w="1"><s ac="0">{words[0]}</s>'
+                   + "".join(f'<s t="{120 * i}" ac="0"> {w}</s>' for i, w in enumerate(words[1:], 1))
+                   + "</p>")
+    out.append("</body></timedtext>")
+    return "".join(out)
+
+
+def measure(fn, repeat=3):
+    """Best wall time over `repeat` runs, then peak traced memory of one more run."""
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    del result
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def chunked(data, size=64 * 1024):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def main():
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    cues = make_cues(hours, random.Random(7))
+    print(f"{len(cues)} cues ({hours:g} h)")
+    for name, doc in (("json3", make_json3(cues)), ("vtt", make_vtt(cues)), ("srv3", make_srv3(cues))):
+        data = doc.encode("utf-8")
+        mb = len(data) / 1e6
+        new, new_t, new_peak = measure(lambda: list(server.iter_caption_segments(chunked(data))))
+        line = f"{name:5s} {mb:6.1f} MB  after {mb / new_t:6.1f} MB/s peak {new_peak / 1e6:6.1f} MB"
+        if name != "srv3":
+            old, old_t, old_peak = measure(lambda: old_parse_caption_content(data.decode("utf-8")))
+            assert old == new, f"{name}: results differ"
+            line += f"   before {mb / old_t:6.1f} MB/s peak {old_peak / 1e6:6.1f} MB"
+        else:
+            assert len(new) == len(cues)
+        print(line + f"   ({len(new)} segments)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Benchmark: /api/formats format selection, before and after the format index.
+
+Builds a yt-dlp-like format list (DASH video at every height in mp4 and webm,
+HLS variants, storyboards and audio), then times:
+  - old: the per-label scans of the old `_build_formats` (condensed copy below), one
+    pass over the list per quality label plus one for audio, on every request
+  - index build: `_format_index`, the single pass done once per extraction
+  - index query: `_build_formats` on a cached VideoSummary (bisect lookups),
+    with and without two extra heights (1080p, 144p)
+
+Usage: python Backend/benchmarks/bench_format_index.py [formats] [iterations]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("VOXTEXT_CACHE_DIR", tempfile.mkdtemp(prefix="voxtext-bench-"))
+os.environ.setdefault("VOXTEXT_YTDL_PREWARM", "0")
+
+import server  # noqa: E402
+
+QUALITY_MAP = {"720p HD": 720, "480p": 480, "360p": 360, "240p": 240}
+
+
+def old_build_formats(info):
+    duration = info.get("duration") or 0
+    formats_list = info.get("formats") or []
+    result = {}
+    for quality_label, target_height in QUALITY_MAP.items():
+        best = None
+        for f in formats_list:
+            h = f.get("height")
+            vcodec = f.get("vcodec")
+            if not h or not vcodec or vcodec == "none":
+                continue
+            if h == target_height:
+                best = f
+                break
+            elif h <= target_height and (not best or h > best.get("height", 0)):
+                best = f
+        max_seconds = server._DOWNLOAD_DURATION_LIMITS[quality_label]
+        if best:
+            size_bytes = best.get("filesize") or best.get("filesize_approx")
+            if not size_bytes and best.get("tbr") and duration > 0:
+                size_bytes = int(best["tbr"] * 1000 / 8 * duration * 1.1)
+            result[quality_label] = {"sizeMB": round((size_bytes or 0) / (1024 * 1024), 1), "available": True,
+                                     "overLimit": duration > max_seconds, "maxMinutes": max_seconds // 60}
+        else:
+            result[quality_label] = {"sizeMB": 0, "available": False, "overLimit": False,
+                                     "maxMinutes": max_seconds // 60}
+    best_audio = None
+    for f in formats_list:
+        acodec = f.get("acodec")
+        vcodec = f.get("vcodec")
+        if acodec and acodec != "none" and (not vcodec or vcodec == "none" or not f.get("height")):
+            if not best_audio or (f.get("abr") or 0) > (best_audio.get("abr") or 0):
+                best_audio = f
+    max_seconds = server._DOWNLOAD_DURATION_LIMITS["Audio Only"]
+    size_bytes = best_audio and (best_audio.get("filesize") or int((best_audio.get("abr") or 0) * 1000 / 8 * duration))
+    result["Audio Only"] = {"sizeMB": round((size_bytes or 0) / (1024 * 1024), 1), "available": bool(best_audio),
+                            "overLimit": duration > max_seconds, "maxMinutes": max_seconds // 60}
+    return {"formats": result, "duration": duration}
+
+
+def make_info(count):
+    formats = []
+    heights = [144, 240, 360, 480, 720, 1080, 1440, 2160]
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            formats.append({"format_id": f"sb{i}", "height": 90, "vcodec": "none", "acodec": "none"})
+        elif kind == 1:
+            formats.append({"format_id": f"a{i}", "ext": "m4a", "vcodec": "none", "acodec": "mp4a.40.2",
+                            "abr": 48 + i % 128})
+        else:
+            height = heights[i % len(heights)]
+            formats.append({"format_id": f"v{i}", "height": height, "vcodec": "vp9" if kind == 2 else "avc1",
+                            "acodec": "none" if kind != 4 else "mp4a", "tbr": height * 3.5,
+                            "protocol": "m3u8_native" if kind == 4 else "https"})
+    # yt-dlp lists formats worst to best
+    formats.sort(key=lambda f: (f.get("height") or 0, f.get("tbr") or 0))
+    return {"id": "benchmark00", "title": "Benchmark video", "duration": 600, "formats": formats}
+
+
+def bench(label, fn, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:>24}: {elapsed / iterations * 1e6:8.1f} us/call")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    info = make_info(count)
+    summary = server.VideoSummary.from_info(info)
+    print(f"{count} formats, {iterations} iterations")
+    bench("old (per-label scans)", lambda: old_build_formats(info), iterations)
+    bench("index build (once)", lambda: server._format_index(info), iterations)
+    bench("index query", lambda: server._build_formats(summary), iterations)
+    bench("index query + 2 heights", lambda: server._build_formats(summary, [1080, 144]), iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Benchmark: caption fetch latency with per-call openers vs the pooled client.
+
+Starts a local keep-alive HTTP stub that serves a json3-sized caption body and
+sets a cookie. Every new connection pays a simulated 20 ms handshake (roughly a
+TCP+TLS setup to YouTube), which loopback would otherwise hide. The body is then
+fetched N times sequentially and from a thread pool with:
+  - the old per-call urllib opener (copied below)
+  - the old per-call YoutubeDL fallback (copied below)
+  - server._iter_url_with_cookies (pooled client, chunks joined)
+
+Usage: python Backend/benchmarks/bench_http_client.py [requests]
+"""
+
+import http.cookiejar
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("VOXTEXT_CACHE_DIR", tempfile.mkdtemp(prefix="voxtext-bench-"))
+
+import yt_dlp  # noqa: E402
+
+import server  # noqa: E402
+
+BODY = (b'{"events":[' + b",".join(
+    b'{"tStartMs":%d,"dDurMs":1500,"segs":[{"utf8":"caption line %d"}]}' % (i * 1500, i) for i in range(4000)
+) + b"]}")
+
+_old_cookie_jar = http.cookiejar.MozillaCookieJar()
+
+
+def old_fetch_url_with_cookies(caption_url):
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(_old_cookie_jar))
+    req = urllib.request.Request(caption_url, headers=server._CAPTION_FETCH_HEADERS)
+    with opener.open(req, timeout=15) as resp:
+        return resp.read().decode("utf-8")
+
+
+def old_fetch_url_via_ytdlp(caption_url):
+    ydl_opts = {"quiet": True, "no_warnings": True, "geo_bypass": True, "noplaylist": True, "socket_timeout": 15}
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        for cookie in _old_cookie_jar:
+            ydl.cookiejar.set_cookie(cookie)
+        content = ydl.urlopen(caption_url).read().decode("utf-8")
+        for cookie in ydl.cookiejar:
+            _old_cookie_jar.set_cookie(cookie)
+        return content
+
+
+def pooled_fetch(caption_url):
+    return b"".join(server._iter_url_with_cookies(caption_url)).decode("utf-8")
+
+
+HANDSHAKE_SECONDS = 0.02
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        time.sleep(HANDSHAKE_SECONDS)
+        super().setup()
+
+    def do_GET(self):
+        time.sleep(0.002)  # Simulated upstream think time
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.send_header("Set-Cookie", "VISITOR_INFO1_LIVE=abc; Path=/")
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(fn, url, n, threads):
+    start = time.perf_counter()
+    if threads == 1:
+        for _ in range(n):
+            fn(url)
+    else:
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(fn, [url] * n))
+    return (time.perf_counter() - start) / n * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    stub = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{stub.server_address[1]}/api/timedtext?v=x&fmt=json3"
+    client = "httpx" if server._caption_http.http2 else "requests"
+    print(f"{n} requests, {len(BODY) / 1024:.0f} KB body, pooled client: {client}")
+    for label, fn, count in (
+        ("urllib opener per call", old_fetch_url_with_cookies, n),
+        ("YoutubeDL per call", old_fetch_url_via_ytdlp, max(n // 10, 5)),
+        ("pooled client", pooled_fetch, n),
+    ):
+        assert fn(url) == BODY.decode()
+        sequential = run(fn, url, count, 1)
+        concurrent = run(fn, url, count, 8)
+        print(f"{label:24s} sequential {sequential:7.2f} ms/req   8 threads {concurrent:7.2f} ms/req")
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
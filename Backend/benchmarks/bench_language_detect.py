@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: per-call cost of title/tag language detection, before and after.
+
+The "before" functions are the per-name regex implementations that the precompiled
+detector in server.py replaced. Both are run on the same titles and tag lists and
+their answers are compared.
+
+Usage: python Backend/benchmarks/bench_language_detect.py [iterations]
+"""
+
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("VOXTEXT_CACHE_DIR", tempfile.mkdtemp(prefix="voxtext-bench-"))
+
+import server  # noqa: E402
+from server import LANGUAGE_NAMES  # noqa: E402
+
+
+def old_detect_language_from_title(title):
+    if not title:
+        return None
+    title_lower = title.lower()
+    for lang_name, readable in sorted(LANGUAGE_NAMES.items(), key=lambda x: -len(x[0])):
+        medium_pattern = r'(?:through|thru|via)\s+' + re.escape(lang_name) + r'(?:[\s\.\,\|\)\]!?]|$)'
+        if re.search(medium_pattern, title_lower):
+            return readable
+    hashtags = re.findall(r'#(\w+)', title_lower)
+    for hashtag in hashtags:
+        for lang_name, readable in sorted(LANGUAGE_NAMES.items(), key=lambda x: -len(x[0])):
+            ht_pattern = r'(?:through|thru|via)' + re.escape(lang_name) + r'$'
+            if re.search(ht_pattern, hashtag):
+                return readable
+    for lang_name, readable in sorted(LANGUAGE_NAMES.items(), key=lambda x: -len(x[0])):
+        pattern = r'(?:^|[\|\(\[\-–—,\s])' + re.escape(lang_name) + r'(?:[\|\)\]\-–—,\s]|$)'
+        if re.search(pattern, title_lower):
+            return readable
+    return None
+
+
+def old_detect_language_from_tags(tags):
+    if not tags:
+        return None
+    lang_counts = {}
+    for tag in tags:
+        tag_lower = tag.lower()
+        for lang_name, readable in LANGUAGE_NAMES.items():
+            pattern = r'(?:^|[\s])' + re.escape(lang_name) + r'(?:[\s]|$)'
+            if re.search(pattern, tag_lower):
+                lang_counts[readable] = lang_counts.get(readable, 0) + 1
+    if not lang_counts:
+        return None
+    non_english = {k: v for k, v in lang_counts.items() if k != "English"}
+    if non_english:
+        return max(non_english, key=non_english.get)
+    return max(lang_counts, key=lang_counts.get)
+
+
+WORDS = ["funny", "video", "comedy", "vlog", "2024", "new", "song", "official", "trailer",
+         "full", "movie", "learn", "speaking", "class", "#shorts", "#viral", "episode", "|", "-"]
+NAMES = list(LANGUAGE_NAMES)
+
+
+def make_title(rng):
+    words = rng.choices(WORDS, k=rng.randint(4, 12))
+    roll = rng.random()
+    if roll < 0.3:
+        words.insert(rng.randrange(len(words) + 1), f"| {rng.choice(NAMES).title()} |")
+    elif roll < 0.45:
+        words.insert(rng.randrange(len(words) + 1), f"through {rng.choice(NAMES)}")
+    elif roll < 0.55:
+        words.append("#englishthrough" + rng.choice(NAMES).replace(" ", ""))
+    return " ".join(words) + " " + " ".join(f"#{w}" for w in rng.choices(WORDS[:9], k=rng.randint(2, 8)))
+
+
+def make_tags(rng):
+    tags = []
+    for _ in range(rng.randint(10, 40)):
+        words = rng.choices(WORDS, k=rng.randint(1, 3))
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(NAMES))
+        tags.append(" ".join(words))
+    return tags
+
+
+def bench(fn, inputs, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for item in inputs:
+            fn(item)
+    return (time.perf_counter() - start) / (iterations * len(inputs))
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    rng = random.Random(42)
+    titles = [make_title(rng) for _ in range(300)]
+    tag_lists = [make_tags(rng) for _ in range(100)]
+
+    mismatches = [t for t in titles if old_detect_language_from_title(t) != server.detect_language_from_title(t)]
+    mismatches += [t for t in tag_lists if old_detect_language_from_tags(t) != server.detect_language_from_tags(t)]
+    print(f"Result mismatches: {len(mismatches)}")
+
+    for label, old, new, inputs in (
+        ("title", old_detect_language_from_title, server.detect_language_from_title, titles),
+        ("tags", old_detect_language_from_tags, server.detect_language_from_tags, tag_lists),
+    ):
+        before = bench(old, inputs, iterations)
+        after = bench(new, inputs, iterations)
+        print(f"{label:6s} before {before * 1e6:9.1f} us/call   after {after * 1e6:8.1f} us/call   "
+              f"speedup {before / after:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
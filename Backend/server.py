@@ -1,17 +1,43 @@
+import asyncio
+import atexit
+import bisect
+import codecs
+import contextlib
+import random
 import re
 import time
+import unicodedata
 import json as json_lib
 import os
+import queue
 import tempfile
 import threading
 import glob as glob_mod
+import gzip
+import hashlib
+import html
+import http.cookiejar
+import io
+import itertools
 import shutil
-import urllib.request
-import urllib.error
+import subprocess
+import sys
+import sqlite3
+import struct
+import zlib
 import urllib.parse
-from flask import Flask, request, jsonify, send_file
+import uuid
+import xml.etree.ElementTree as ET
+from array import array
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
+from werkzeug.http import http_date, is_resource_modified
+from werkzeug.wsgi import FileWrapper
+import requests
 import yt_dlp
+from yt_dlp.cookies import YoutubeDLCookieJar
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import (
     TranscriptsDisabled,
@@ -20,9 +46,69 @@ from youtube_transcript_api._errors import (
     YouTubeRequestFailed,
     CouldNotRetrieveTranscript
 )
+try:
+    import msgpack  # Optional: enables application/msgpack caption responses
+except ImportError:
+    msgpack = None
+try:
+    import brotli  # Optional: enables Content-Encoding: br
+except ImportError:
+    brotli = None
+try:
+    import httpx  # Optional: HTTP/2 caption fetches (needs the h2 package too)
+    import h2  # noqa: F401
+except ImportError:
+    httpx = None
 
 app = Flask(__name__)
-CORS(app, expose_headers=["Content-Disposition"])
+# Request bodies (translate segments, batch ID lists) over this size get a 413
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("VOXTEXT_MAX_BODY_BYTES", str(16 * 1024 * 1024)))
+CORS(app, expose_headers=["Content-Disposition", "ETag", "Last-Modified"])
+
+# Response compression for JSON/text bodies above a size threshold. Brotli is
+# offered when the optional `brotli` package is installed, gzip otherwise.
+_COMPRESS_MIN_BYTES = int(os.environ.get("VOXTEXT_COMPRESS_MIN_BYTES", "1024"))
+_COMPRESS_MIMETYPES = {
+    "application/json",
+    "application/vnd.voxtext.columnar+json",
+    "application/vnd.voxtext.segments",
+    "application/msgpack",
+    "text/plain",
+    "text/html",
+}
+_COMPRESS_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _accepted_encoding():
+    """Return the preferred content coding the client accepts, or None."""
+    return request.accept_encodings.best_match(_COMPRESS_ENCODINGS)
+
+
+def _compress_body(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+@app.after_request
+def _compress_response(response):
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers or response.mimetype not in _COMPRESS_MIMETYPES):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = _accepted_encoding()
+    if not encoding:
+        return response
+    body = response.get_data()
+    if len(body) < _COMPRESS_MIN_BYTES:
+        return response
+    response.set_data(_compress_body(body, encoding))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
 
 
 @app.route("/health", methods=["GET"])
@@ -30,19 +116,826 @@ def health_check():
     """Health check endpoint for monitoring."""
     return jsonify({"status": "healthy", "service": "voxtext-backend"}), 200
 
-# In-memory cache for yt-dlp info to avoid duplicate extractions (429 rate limits)
-# Key: video URL, Value: {"info": dict, "cookie_jar": CookieJar, "timestamp": float}
-_info_cache = {}
+# Shared cache tier. Every gunicorn worker opens the same SQLite file, so a video
+# extracted by one worker is a cache hit for the others (duplicate extractions are
+# what trigger YouTube 429s). Set VOXTEXT_REDIS_URL to use Redis instead.
+_CACHE_DIR = os.environ.get("VOXTEXT_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "voxtext-cache")
+_CACHE_DB_PATH = os.path.join(_CACHE_DIR, "cache.sqlite3")
+_REDIS_URL = os.environ.get("VOXTEXT_REDIS_URL")
+
+
+def _encode_cache_value(value):
+    """Serialize a JSON-compatible value into a compact zlib-compressed blob."""
+    return zlib.compress(json_lib.dumps(value, separators=(",", ":"), default=str).encode("utf-8"), 6)
+
+
+def _decode_cache_value(blob):
+    return json_lib.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class _SQLiteStore:
+    """Base for stores kept in a SQLite file shared by all workers.
+
+    Subclasses set SCHEMA; connections are opened lazily, one per thread and per
+    forked worker process, in autocommit mode with WAL journaling.
+    """
+
+    SCHEMA = ""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(self.SCHEMA)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+
+# Hit/miss counters are buffered per worker and written at most this often (and
+# whenever stats are read), so a cache hit does not write to the shared file
+_CACHE_STATS_FLUSH_INTERVAL = 5
+# last_access is only rewritten when it is older than this: LRU order is approximate
+# to within this many seconds, but repeat hits on a hot entry cost no write
+_CACHE_TOUCH_INTERVAL = 60
+# Expired entries are swept (and counted as evictions) at most this often per worker
+_CACHE_SWEEP_INTERVAL = 60
+
+
+class _CacheCounters:
+    """Hit/miss counts for one cache namespace, buffered in memory and taken in batches."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._pid = os.getpid()
+        self._taken_at = time.monotonic()
+
+    def add(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def take(self, force=False):
+        """Return and reset the pending counts, at most once per flush interval unless forced."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Counts inherited across a fork belong to the parent
+                self._counts.clear()
+                self._pid = os.getpid()
+            if not self._counts or (not force and time.monotonic() - self._taken_at < _CACHE_STATS_FLUSH_INTERVAL):
+                return None
+            counts, self._counts = self._counts, Counter()
+            self._taken_at = time.monotonic()
+            return counts
+
+
+class _SQLiteCache(_SQLiteStore):
+    """Namespaced TTL + LRU cache stored in a SQLite file shared by all workers.
+
+    Entries expire after `ttl` seconds and the least recently used ones are evicted
+    once the namespace holds more than `max_entries` entries or `max_bytes` bytes.
+    Entry count and size are kept as running totals, so a write only walks the LRU
+    index when a bound is crossed. Hit/miss/eviction counters live in the same file
+    so they cover every worker.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            last_access REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        );
+        CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (namespace, last_access);
+        CREATE TABLE IF NOT EXISTS cache_stats (
+            namespace TEXT PRIMARY KEY,
+            hits INTEGER NOT NULL DEFAULT 0,
+            misses INTEGER NOT NULL DEFAULT 0,
+            evictions INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS cache_usage (
+            namespace TEXT PRIMARY KEY,
+            entries INTEGER NOT NULL,
+            bytes INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS cache_locks (
+            name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+    """
+
+    encode = staticmethod(_encode_cache_value)
+    decode = staticmethod(_decode_cache_value)
+
+    def __init__(self, path, namespace, ttl, max_entries=None, max_bytes=None):
+        super().__init__(path)
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.counters = _CacheCounters()
+        self._swept_at = 0
+        atexit.register(self._flush_counters, True)
+
+    def _count(self, conn, column, amount=1):
+        conn.execute(
+            f"INSERT INTO cache_stats (namespace, {column}) VALUES (?, ?) "
+            f"ON CONFLICT(namespace) DO UPDATE SET {column} = {column} + excluded.{column}",
+            (self.namespace, amount),
+        )
+
+    def _record(self, name, amount=1):
+        self.counters.add(name, amount)
+        self._flush_counters()
+
+    def _flush_counters(self, force=False):
+        counts = self.counters.take(force)
+        if counts:
+            conn = self._conn()
+            for column, amount in counts.items():
+                self._count(conn, column, amount)
+
+    def _usage(self, conn):
+        """(entries, bytes) of the namespace, initialized from the table on first use."""
+        row = conn.execute(
+            "SELECT entries, bytes FROM cache_usage WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        if row is None:
+            row = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+                (self.namespace,),
+            ).fetchone()
+            conn.execute("INSERT INTO cache_usage (namespace, entries, bytes) VALUES (?, ?, ?)",
+                         (self.namespace, *row))
+        return row
+
+    def _adjust_usage(self, conn, entries, size):
+        """Apply a change to the running totals; _usage must have run in this transaction."""
+        conn.execute(
+            "UPDATE cache_usage SET entries = entries + ?, bytes = bytes + ? WHERE namespace = ?",
+            (entries, size, self.namespace),
+        )
+
+    def get(self, key, record_stats=True):
+        """Return the cached value for `key`, or None on a miss."""
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at, last_access FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None or row[1] <= now:
+            if record_stats:
+                self._record("misses")
+            return None
+        if now - row[2] > _CACHE_TOUCH_INTERVAL:
+            conn.execute(
+                "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+        if record_stats:
+            self._record("hits")
+        return self.decode(row[0])
+
+    def _write(self, rows, now):
+        """Insert or replace (key, blob, expires_at) rows, then evict, in one transaction."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._usage(conn)
+            added = grown = 0
+            for key, blob, expires_at in rows:
+                old = conn.execute(
+                    "SELECT size FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+                ).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, expires_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, key, blob, len(blob), expires_at, now),
+                )
+                added += old is None
+                grown += len(blob) - (old[0] if old else 0)
+            self._adjust_usage(conn, added, grown)
+            self._evict(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        self._write([(key, self.encode(value), now + (ttl if ttl is not None else self.ttl))], now)
+
+    def get_many(self, keys, record_stats=True):
+        """Return {key: value} for the keys present, in one read (plus one LRU update for stale entries)."""
+        now = time.time()
+        conn = self._conn()
+        found = {}
+        stale = []
+        keys = list(keys)
+        for i in range(0, len(keys), 500):  # Stay under SQLite's bound-variable limit
+            chunk = keys[i:i + 500]
+            rows = conn.execute(
+                f"SELECT key, value, last_access FROM cache_entries WHERE namespace = ? AND expires_at > ? "
+                f"AND key IN ({','.join('?' * len(chunk))})",
+                (self.namespace, now, *chunk),
+            ).fetchall()
+            for key, value, last_access in rows:
+                found[key] = self.decode(value)
+                if now - last_access > _CACHE_TOUCH_INTERVAL:
+                    stale.append(key)
+        if stale:
+            conn.executemany(
+                "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                [(now, self.namespace, key) for key in stale],
+            )
+        if record_stats:
+            if found:
+                self._record("hits", len(found))
+            if len(keys) > len(found):
+                self._record("misses", len(keys) - len(found))
+        return found
+
+    def set_many(self, items, ttl=None):
+        """Store several {key: value} entries in one transaction."""
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl)
+        rows = [(key, self.encode(value), expires_at) for key, value in items.items()]
+        if rows:
+            self._write(rows, now)
+
+    def delete(self, key):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._usage(conn)
+            row = conn.execute(
+                "SELECT size FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+                self._adjust_usage(conn, -1, -row[0])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def acquire_lock(self, key, owner, ttl):
+        """Take the cross-worker lock for `key`; returns False if another owner holds it."""
+        name = f"{self.namespace}:{key}"
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM cache_locks WHERE name = ? AND expires_at <= ?", (name, now))
+            acquired = conn.execute(
+                "INSERT OR IGNORE INTO cache_locks (name, owner, expires_at) VALUES (?, ?, ?)",
+                (name, owner, now + ttl),
+            ).rowcount == 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return acquired
+
+    def release_lock(self, key, owner):
+        self._conn().execute(
+            "DELETE FROM cache_locks WHERE name = ? AND owner = ?", (f"{self.namespace}:{key}", owner)
+        )
+
+    def _sweep(self, conn, now):
+        """Delete expired entries; returns how many were removed."""
+        expired, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, now),
+        ).fetchone()
+        if expired:
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?", (self.namespace, now))
+            self._adjust_usage(conn, -expired, -size)
+        return expired
+
+    def sweep(self):
+        """Delete expired entries now, counting them as evictions; returns how many were removed."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._usage(conn)
+            removed = self._sweep(conn, now)
+            if removed:
+                self._count(conn, "evictions", removed)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._swept_at = now
+        return removed
+
+    def _evict(self, conn, now):
+        removed = 0
+        if now - self._swept_at > _CACHE_SWEEP_INTERVAL:
+            self._swept_at = now
+            removed += self._sweep(conn, now)
+        if self.max_entries is None and self.max_bytes is None:
+            if removed:
+                self._count(conn, "evictions", removed)
+            return
+        count, total = self._usage(conn)
+        over_count = self.max_entries is not None and count > self.max_entries
+        over_bytes = self.max_bytes is not None and total > self.max_bytes
+        if over_count or over_bytes:
+            # Expired entries go first, then least recently used until both bounds hold
+            removed += self._sweep(conn, now)
+            count, total = self._usage(conn)
+            victims = []
+            freed = 0
+            for key, size in conn.execute(
+                "SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY last_access",
+                (self.namespace,),
+            ).fetchall()[:-1]:
+                if (self.max_entries is None or count <= self.max_entries) and \
+                        (self.max_bytes is None or total <= self.max_bytes):
+                    break
+                victims.append((self.namespace, key))
+                count -= 1
+                total -= size
+                freed += size
+            conn.executemany("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", victims)
+            self._adjust_usage(conn, -len(victims), -freed)
+            removed += len(victims)
+        if removed:
+            self._count(conn, "evictions", removed)
+
+    def stats(self):
+        self._flush_counters(force=True)
+        conn = self._conn()
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()
+        row = conn.execute(
+            "SELECT hits, misses, evictions FROM cache_stats WHERE namespace = ?", (self.namespace,)
+        ).fetchone() or (0, 0, 0)
+        hits, misses, evictions = row
+        lookups = hits + misses
+        return {
+            "backend": "sqlite",
+            "entries": count,
+            "bytes": total,
+            "hits": hits,
+            "misses": misses,
+            "evictions": evictions,
+            "hitRatio": round(hits / lookups, 4) if lookups else None,
+        }
+
+
+class _SQLiteBlobCache(_SQLiteCache):
+    """_SQLiteCache for ready-made bytes (e.g. compressed bodies), stored as-is."""
+
+    encode = staticmethod(bytes)
+    decode = staticmethod(bytes)
+
+
+class _RedisCache:
+    """Same interface as _SQLiteCache, backed by Redis (or any client speaking its API).
+
+    A sorted set per namespace tracks last access for LRU eviction; TTLs are native
+    Redis expiries. Entry count and size are running totals in a hash, so a write
+    only walks the LRU set when a bound is crossed. Pass `client` to plug in a local
+    stand-in such as fakeredis.
+    """
+
+    def __init__(self, client, namespace, ttl, max_entries=None, max_bytes=None):
+        self.client = client
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.counters = _CacheCounters()
+        self._prefix = f"voxtext:{namespace}:"
+        self._lru_key = f"voxtext:{namespace}:__lru__"
+        self._sizes_key = f"voxtext:{namespace}:__sizes__"
+        self._usage_key = f"voxtext:{namespace}:__usage__"
+        self._stats_key = f"voxtext:{namespace}:__stats__"
+        self._usage_ready = False
+        atexit.register(self._flush_counters, True)
+
+    def _record(self, name, amount=1):
+        self.counters.add(name, amount)
+        self._flush_counters()
+
+    def _flush_counters(self, force=False):
+        counts = self.counters.take(force)
+        if counts:
+            pipe = self.client.pipeline()
+            for name, amount in counts.items():
+                pipe.hincrby(self._stats_key, name, amount)
+            pipe.execute()
+
+    def _forget(self, key):
+        """Drop the LRU/size bookkeeping of `key` and its share of the running totals."""
+        self._ensure_usage()
+        size = self.client.hget(self._sizes_key, key)
+        pipe = self.client.pipeline()
+        pipe.zrem(self._lru_key, key)
+        pipe.hdel(self._sizes_key, key)
+        if size is not None:
+            pipe.hincrby(self._usage_key, "entries", -1)
+            pipe.hincrby(self._usage_key, "bytes", -int(size))
+        pipe.execute()
+
+    def get(self, key, record_stats=True):
+        blob = self.client.get(self._prefix + key)
+        if blob is None:
+            # Drop LRU bookkeeping for entries Redis already expired
+            if self.client.zscore(self._lru_key, key) is not None:
+                self._forget(key)
+            if record_stats:
+                self._record("misses")
+            return None
+        now = time.time()
+        touched = self.client.zscore(self._lru_key, key)
+        if touched is None or now - touched > _CACHE_TOUCH_INTERVAL:
+            self.client.zadd(self._lru_key, {key: now})
+        if record_stats:
+            self._record("hits")
+        return _decode_cache_value(blob)
+
+    def set(self, key, value, ttl=None):
+        blob = _encode_cache_value(value)
+        ttl_ms = int((ttl if ttl is not None else self.ttl) * 1000)
+        self._ensure_usage()
+        old = self.client.hget(self._sizes_key, key)
+        pipe = self.client.pipeline()
+        pipe.set(self._prefix + key, blob, px=max(ttl_ms, 1))
+        pipe.zadd(self._lru_key, {key: time.time()})
+        pipe.hset(self._sizes_key, key, len(blob))
+        if old is None:
+            pipe.hincrby(self._usage_key, "entries", 1)
+        pipe.hincrby(self._usage_key, "bytes", len(blob) - int(old or 0))
+        pipe.execute()
+        self._evict()
+
+    def delete(self, key):
+        self.client.delete(self._prefix + key)
+        self._forget(key)
+
+    def acquire_lock(self, key, owner, ttl):
+        return bool(self.client.set(f"voxtext:lock:{self.namespace}:{key}", owner, nx=True, px=int(ttl * 1000)))
+
+    def release_lock(self, key, owner):
+        lock_key = f"voxtext:lock:{self.namespace}:{key}"
+        current = self.client.get(lock_key)
+        if current is not None and (current.decode() if isinstance(current, bytes) else current) == owner:
+            self.client.delete(lock_key)
+
+    def _ensure_usage(self):
+        """Start the running totals from the sizes hash if the namespace predates them."""
+        if self._usage_ready:
+            return
+        if not self.client.exists(self._usage_key):
+            sizes = [int(v) for v in self.client.hvals(self._sizes_key)]
+            self.client.hsetnx(self._usage_key, "entries", len(sizes))
+            self.client.hsetnx(self._usage_key, "bytes", sum(sizes))
+        self._usage_ready = True
+
+    def _usage(self):
+        self._ensure_usage()
+        count, total = self.client.hmget(self._usage_key, ["entries", "bytes"])
+        return int(count or 0), int(total or 0)
+
+    def _within_bounds(self, count, total):
+        return (self.max_entries is None or count <= self.max_entries) and \
+            (self.max_bytes is None or total <= self.max_bytes)
+
+    def _evict(self):
+        if self.max_entries is None and self.max_bytes is None:
+            return
+        count, total = self._usage()
+        if self._within_bounds(count, total):
+            return
+        evicted = 0
+        # Least recently used first; entries Redis already expired are among the oldest
+        for key in self.client.zrange(self._lru_key, 0, -2):
+            if self._within_bounds(count, total):
+                break
+            key = key.decode() if isinstance(key, bytes) else key
+            size = int(self.client.hget(self._sizes_key, key) or 0)
+            self.delete(key)
+            count -= 1
+            total -= size
+            evicted += 1
+        if evicted:
+            self.client.hincrby(self._stats_key, "evictions", evicted)
+
+    def stats(self):
+        self._flush_counters(force=True)
+        raw = self.client.hgetall(self._stats_key)
+        counters = {(k.decode() if isinstance(k, bytes) else k): int(v) for k, v in raw.items()}
+        count, total = self._usage()
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        lookups = hits + misses
+        return {
+            "backend": "redis",
+            "entries": count,
+            "bytes": total,
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "hitRatio": round(hits / lookups, 4) if lookups else None,
+        }
+
+
+_redis_client = None
+
+
+def _make_cache(namespace, ttl, max_entries=None, max_bytes=None):
+    """Build a shared cache namespace on Redis if configured, else on the SQLite file."""
+    global _redis_client
+    if _REDIS_URL:
+        if _redis_client is None:
+            import redis  # Optional dependency, only needed when VOXTEXT_REDIS_URL is set
+            _redis_client = redis.Redis.from_url(_REDIS_URL)
+        return _RedisCache(_redis_client, namespace, ttl, max_entries, max_bytes)
+    return _SQLiteCache(_CACHE_DB_PATH, namespace, ttl, max_entries, max_bytes)
+
+
+def _cache_key_for_url(url):
+    """Normalize a YouTube URL to its video ID so URL variants share one cache entry."""
+    return _extract_video_id(url) or url.strip()
+
+
+# Shared cache for yt-dlp extractions to avoid duplicates (429 rate limits)
+# Key: video ID, Value: VideoSummary.to_dict() (the raw info dict is not kept)
 _CACHE_TTL = 300  # 5 minutes
+_INFO_CACHE_MAX_ENTRIES = int(os.environ.get("VOXTEXT_INFO_CACHE_MAX_ENTRIES", "500"))
+_INFO_CACHE_MAX_BYTES = int(os.environ.get("VOXTEXT_INFO_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Namespaces are versioned: bump them when VideoSummary's fields change
+_info_cache = _make_cache("summary-v3", _CACHE_TTL, _INFO_CACHE_MAX_ENTRIES, _INFO_CACHE_MAX_BYTES)
+# Metadata-only extractions (see _extract_lite_info_uncached), kept apart so a lite
+# entry is never served to the formats/download paths
+_info_lite_cache = _make_cache("summary-lite-v3", _CACHE_TTL, _INFO_CACHE_MAX_ENTRIES, _INFO_CACHE_MAX_BYTES)
+
+# Caption result cache to avoid repeated requests for same video+language.
+# Always a local SQLite file: transcripts are compressed segment lists.
+# Key: "<video_id>:<lang_code or auto>", Value: {"status", "payload", "etag", "storedAt"}
+# "No captions" answers are cached too, for a shorter time.
+_CAPTION_CACHE_TTL = 6 * 3600  # 6 hours - captions rarely change once published
+_CAPTION_NEGATIVE_TTL = 600  # 10 minutes
+_CAPTION_CACHE_MAX_BYTES = int(os.environ.get("VOXTEXT_CAPTION_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+_caption_result_cache = _SQLiteCache(
+    _CACHE_DB_PATH, "captions", _CAPTION_CACHE_TTL, max_bytes=_CAPTION_CACHE_MAX_BYTES
+)
+# Compressed caption bodies, so a cache hit is served without serializing or
+# compressing again. Key: "<representation etag>:<gzip|br>", Value: encoded body bytes
+_caption_body_cache = _SQLiteBlobCache(
+    _CACHE_DB_PATH, "caption-bodies", _CAPTION_CACHE_TTL, max_bytes=_CAPTION_CACHE_MAX_BYTES // 2
+)
 
-# Caption result cache to avoid repeated requests for same video+language
-# Key: (video_url, lang_code), Value: {"result": dict, "timestamp": float}
-_caption_result_cache = {}
-_CAPTION_CACHE_TTL = 600  # 10 minutes
+# Translation memory: segment translations keyed by (normalized text, language pair),
+# so repeated lines ("[Music]", intros, re-translated videos) skip Google Translate.
+# Always a local SQLite file. Key: sha1 of "<source>\0<target>\0<text>", Value: translated text
+_TM_TTL = 30 * 24 * 3600  # 30 days
+_TM_MAX_BYTES = int(os.environ.get("VOXTEXT_TM_MAX_BYTES", str(128 * 1024 * 1024)))
+_translation_memory = _SQLiteCache(_CACHE_DB_PATH, "tm", _TM_TTL, max_bytes=_TM_MAX_BYTES)
+
+class _CookieStore(_SQLiteStore):
+    """Cookies shared by all workers, one row per (domain, path, name).
+
+    Every write gets an increasing `version` so each worker can pull just the rows
+    changed since its last sync. Versions come from a counter in cookie_meta, not
+    MAX(version), so purging the newest rows never hands out a version twice.
+    Deletions are kept as rows with NULL data (tombstones) whose `expires` is
+    `tombstone_ttl` seconds after the deletion, long enough for every worker to
+    pull them; they are then purged with the expired cookies.
+    """
 
-# Shared cookie jar across all yt-dlp sessions (persists YouTube auth cookies)
-import http.cookiejar
-_cookie_jar = http.cookiejar.MozillaCookieJar()
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cookies (
+            domain TEXT NOT NULL,
+            path TEXT NOT NULL,
+            name TEXT NOT NULL,
+            data TEXT,
+            expires REAL,
+            version INTEGER NOT NULL,
+            writer TEXT NOT NULL,
+            PRIMARY KEY (domain, path, name)
+        );
+        CREATE INDEX IF NOT EXISTS cookies_version ON cookies (version);
+        CREATE TABLE IF NOT EXISTS cookie_meta (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO cookie_meta (name, value)
+            SELECT 'version', COALESCE(MAX(version), 0) FROM cookies;
+    """
+
+    def __init__(self, path, tombstone_ttl):
+        super().__init__(path)
+        self.tombstone_ttl = tombstone_ttl
+
+    def write(self, changes, writer):
+        """Store {(domain, path, name): Cookie or None} in one transaction."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("UPDATE cookie_meta SET value = value + ? WHERE name = 'version'", (len(changes),))
+            version = conn.execute("SELECT value FROM cookie_meta WHERE name = 'version'").fetchone()[0]
+            version -= len(changes)
+            rows = []
+            for (domain, path, name), cookie in changes.items():
+                version += 1
+                if cookie is not None:
+                    data, expires = json_lib.dumps(_cookie_to_dict(cookie)), cookie.expires
+                else:
+                    data, expires = None, now + self.tombstone_ttl
+                rows.append((domain, path, name, data, expires, version, writer))
+            conn.executemany(
+                "INSERT OR REPLACE INTO cookies (domain, path, name, data, expires, version, writer) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            # Expired cookies and tombstones every worker has had time to pull
+            conn.execute("DELETE FROM cookies WHERE expires < ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def changes_since(self, version):
+        """Return ([(domain, path, name, data, writer)], latest version)."""
+        rows = self._conn().execute(
+            "SELECT domain, path, name, data, writer, version FROM cookies WHERE version > ? ORDER BY version",
+            (version,),
+        ).fetchall()
+        latest = rows[-1][5] if rows else version
+        return [row[:5] for row in rows], latest
+
+
+_COOKIE_FIELDS = (
+    "version", "name", "value", "port", "port_specified", "domain", "domain_specified",
+    "domain_initial_dot", "path", "path_specified", "secure", "expires", "discard",
+    "comment", "comment_url",
+)
+
+
+def _cookie_to_dict(cookie):
+    data = {field: getattr(cookie, field) for field in _COOKIE_FIELDS}
+    data["rest"] = cookie._rest
+    data["rfc2109"] = cookie.rfc2109
+    return data
+
+
+def _cookie_from_dict(data):
+    return http.cookiejar.Cookie(**{field: data[field] for field in _COOKIE_FIELDS},
+                                 rest=data["rest"], rfc2109=data["rfc2109"])
+
+
+class _SharedCookieJar(YoutubeDLCookieJar):
+    """YoutubeDLCookieJar kept in sync with a _CookieStore shared by all workers.
+
+    Changes are collected in memory and written in one batch every `interval`
+    seconds by a background thread, which also pulls in other workers' changes,
+    so request threads never touch the database.
+    """
+
+    def __init__(self, store, interval):
+        super().__init__()
+        self.store = store
+        self.interval = interval
+        self._dirty = {}
+        self._dirty_lock = threading.Lock()
+        self._tracking = True
+        self._version = 0
+        self._writer = uuid.uuid4().hex
+        self._last_sync = None
+
+    def _mark(self, keys_to_cookies):
+        if self._tracking:
+            with self._dirty_lock:
+                self._dirty.update(keys_to_cookies)
+
+    def set_cookie(self, cookie):
+        super().set_cookie(cookie)
+        self._mark({(cookie.domain, cookie.path, cookie.name): cookie})
+
+    def clear(self, domain=None, path=None, name=None):
+        with self._cookies_lock:
+            removed = [
+                (c.domain, c.path, c.name) for c in self
+                if (domain is None or c.domain == domain) and (path is None or c.path == path)
+                and (name is None or c.name == name)
+            ]
+            super().clear(domain, path, name)
+        self._mark({key: None for key in removed})
+
+    def load_seed(self, filename):
+        """Load a cookies.txt file without writing it to the shared store."""
+        self._tracking = False
+        try:
+            self.load(filename)
+        finally:
+            self._tracking = True
+
+    def sync(self):
+        """Write pending changes in one batch, then apply other workers' changes."""
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, {}
+        try:
+            if dirty:
+                self.store.write(dirty, self._writer)
+            rows, self._version = self.store.changes_since(self._version)
+        except sqlite3.Error as e:
+            print(f"[cookies] Sync failed: {e}")
+            with self._dirty_lock:
+                self._dirty = {**dirty, **self._dirty}
+            return
+        with self._cookies_lock:
+            for domain, path, name, data, writer in rows:
+                if writer == self._writer:
+                    continue
+                if data is None:
+                    with contextlib.suppress(KeyError):
+                        http.cookiejar.CookieJar.clear(self, domain, path, name)
+                else:
+                    http.cookiejar.CookieJar.set_cookie(self, _cookie_from_dict(json_lib.loads(data)))
+        self._last_sync = time.time()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.sync()
+
+    def start(self):
+        """Pull the stored cookies and start the background sync thread for this process."""
+        self.sync()
+        threading.Thread(target=self._run, name="voxtext-cookie-sync", daemon=True).start()
+
+    def after_fork(self):
+        # Locks may have been held by threads that do not exist in the child
+        self._cookies_lock = threading.RLock()
+        self._dirty_lock = threading.Lock()
+        self._writer = uuid.uuid4().hex
+        self.start()
+
+    def stats(self):
+        with self._dirty_lock:
+            pending = len(self._dirty)
+        return {"cookies": len(self), "pendingWrites": pending, "lastSync": self._last_sync}
+
+
+# Shared cookie jar across all yt-dlp sessions (persists YouTube auth cookies).
+# YoutubeDL instances use this jar directly rather than copying cookies in and out.
+# It is persisted in the shared SQLite file and synced between workers every
+# _COOKIE_SYNC_INTERVAL seconds; youtube_cookies.txt (helps bypass bot detection
+# on VPS/cloud IPs) seeds it and stored cookies take precedence.
+_COOKIES_PATH = os.path.join(os.path.dirname(__file__), "youtube_cookies.txt")
+_COOKIE_SYNC_INTERVAL = float(os.environ.get("VOXTEXT_COOKIE_SYNC_INTERVAL", "30"))
+# Deletions are kept for one sync interval per worker (WEB_CONCURRENCY, which gunicorn
+# and uvicorn read too) so that workers whose syncs fall behind still see them
+_COOKIE_TOMBSTONE_TTL = _COOKIE_SYNC_INTERVAL * max(int(os.environ.get("WEB_CONCURRENCY", "4")), 1)
+_cookie_jar = _SharedCookieJar(_CookieStore(_CACHE_DB_PATH, _COOKIE_TOMBSTONE_TTL), _COOKIE_SYNC_INTERVAL)
+if os.path.exists(_COOKIES_PATH):
+    try:
+        _cookie_jar.load_seed(_COOKIES_PATH)
+    except Exception as e:
+        print(f"[cookies] Could not load {_COOKIES_PATH}: {e}")
+_cookie_jar.start()
+os.register_at_fork(after_in_child=_cookie_jar.after_fork)
+atexit.register(_cookie_jar.sync)
+
+
+@app.route("/api/stats", methods=["GET"])
+def get_stats():
+    """Cache counters shared by all workers (plus this worker's YoutubeDL pools), for tuning."""
+    return jsonify({
+        "caches": {
+            "info": _info_cache.stats(),
+            "infoLite": _info_lite_cache.stats(),
+            "captions": _caption_result_cache.stats(),
+            "captionBodies": _caption_body_cache.stats(),
+            "artifacts": _artifacts.stats(),
+            "translationMemory": _translation_memory.stats(),
+            "playlists": _playlist_cache.stats(),
+        },
+        "ytdlPools": {pool.name: pool.stats() for pool in _YTDL_POOLS},
+        "cookieJar": _cookie_jar.stats(),
+        "asgi": asgi_app.stats(),
+        "prefetch": _caption_prefetcher.stats() if _caption_prefetcher is not None else {"enabled": False},
+    })
 
 
 def _extract_video_id(url):
@@ -93,13 +986,13 @@ def _get_transcript_via_api(video_id, languages=None):
                 transcript = list(transcript_list)[0].fetch()
 
         # Convert to segments format
-        segments = []
+        segments = SegmentStore()
         for entry in transcript:
-            segments.append({
-                "startMs": int(entry.start * 1000),
-                "endMs": int((entry.start + entry.duration) * 1000),
-                "text": entry.text
-            })
+            segments.append(
+                int(entry.start * 1000),
+                int((entry.start + entry.duration) * 1000),
+                entry.text,
+            )
 
         return {
             "language": transcript.language_code,
@@ -120,198 +1013,957 @@ def _get_transcript_via_api(video_id, languages=None):
         return None
 
 
-def _extract_info_cached(url):
-    """Extract video info via yt-dlp, using cache to avoid duplicate requests."""
-    now = time.time()
-    # Clean expired entries
-    expired = [k for k, v in _info_cache.items() if now - v["timestamp"] > _CACHE_TTL]
-    for k in expired:
-        del _info_cache[k]
+# Single-flight coalescing for extractions. Concurrent callers for the same video ID
+# share one extract_info call: in-process through _inflight, across workers through
+# the cache lock table. Failures are kept briefly so waiters see the same error.
+_FLIGHT_LOCK_TTL = 90  # Longer than a worst-case extraction (socket_timeout x retries)
+_FLIGHT_POLL_INTERVAL = 0.2
+_FLIGHT_ERROR_TTL = 5
+_info_errors = _make_cache("info-errors", _FLIGHT_ERROR_TTL)
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+class _Flight:
+    """A call in progress; followers wait on `done` and read its result or error."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _single_flight(key, fn):
+    """Run fn() once for all concurrent callers of `key` in this process."""
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _Flight()
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+    try:
+        flight.result = fn()
+        return flight.result
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        flight.done.set()
 
-    if url in _info_cache:
-        return _info_cache[url]["info"]
 
-    # Check for YouTube cookies file to bypass bot detection
-    cookies_path = os.path.join(os.path.dirname(__file__), "youtube_cookies.txt")
+def _raise_shared_error(failure):
+    """Re-raise an extraction error recorded by another worker."""
+    if failure.get("type") == "DownloadError":
+        raise yt_dlp.utils.DownloadError(failure["message"])
+    raise RuntimeError(failure["message"])
 
-    # IMPORTANT:
-    # Avoid forcing YouTube "player_client" variants here. It can drastically reduce the
-    # returned format list (sometimes down to only storyboards / 360p), which breaks
-    # /api/formats and /api/download in production.
-    ydl_opts = {
-        "quiet": True,
-        "no_warnings": True,
-        "skip_download": True,
-        "geo_bypass": True,
-        "ignore_no_formats_error": True,
-        "noplaylist": True,
-        "socket_timeout": 15,
-        "retries": 2,
-        "fragment_retries": 2,
-        "extractor_retries": 2,
-        "http_headers": {
-            # Use a normal browser UA to get a complete format list.
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/121.0.0.0 Safari/537.36"
-            ),
-            "Accept-Language": "en-US,en;q=0.9",
-        },
-    }
 
-    # Add cookies if available (helps bypass YouTube bot detection on VPS/cloud IPs)
-    if os.path.exists(cookies_path):
-        ydl_opts["cookiefile"] = cookies_path
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        # Inject shared cookie jar so cookies persist across requests
-        if hasattr(ydl, 'cookiejar'):
-            for cookie in _cookie_jar:
-                ydl.cookiejar.set_cookie(cookie)
+def _extract_info_cached(url, cache=None, extract=None, on_miss=None):
+    """Extract a VideoSummary via yt-dlp, using cache to avoid duplicate requests.
+
+    `cache`/`extract` default to the full extraction; the metadata path passes the
+    lite pair. `on_miss` is called before extracting, e.g. to wait for a rate limiter.
+    """
+    if cache is None:
+        cache = _info_cache
+    cache_key = _cache_key_for_url(url)
+    summary = cache.get(cache_key)
+    if summary is None:
+        if on_miss is not None:
+            on_miss()
+        summary = _single_flight(
+            f"{cache.namespace}:{cache_key}",
+            lambda: _extract_info_across_workers(url, cache_key, cache, extract or _extract_info_uncached),
+        )
+    return VideoSummary.from_dict(summary)
+
+
+def _extract_info_across_workers(url, cache_key, cache, extract):
+    """Extract once across all workers: take the lock or wait for its holder's result."""
+    owner = uuid.uuid4().hex
+    while True:
+        cached = cache.get(cache_key, record_stats=False)
+        if cached is not None:
+            return cached
+        # Shared by the full and lite paths: a private video fails both
+        failure = _info_errors.get(cache_key, record_stats=False)
+        if failure is not None:
+            _raise_shared_error(failure)
+        if cache.acquire_lock(cache_key, owner, _FLIGHT_LOCK_TTL):
+            break
+        time.sleep(_FLIGHT_POLL_INTERVAL)
+
+    try:
+        info = extract(url)
+        # Publish before releasing the lock so waiting workers find the entry
+        cache.set(cache_key, info)
+        return info
+    except Exception as e:
+        _info_errors.set(cache_key, {"type": type(e).__name__, "message": str(e)})
+        raise
+    finally:
+        cache.release_lock(cache_key, owner)
+
+
+def _extract_metadata_info(url, on_miss=None):
+    """Summary for metadata-only callers: the full one if it is cached, else the lite extraction."""
+    summary = _info_cache.get(_cache_key_for_url(url), record_stats=False)
+    if summary is not None:
+        return VideoSummary.from_dict(summary)
+    return _extract_info_cached(url, _info_lite_cache, _extract_lite_info_uncached, on_miss)
+
+
+# Browser-like headers for every yt-dlp session
+_YTDL_HTTP_HEADERS = {
+    # Use a normal browser UA to get a complete format list.
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/121.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# YoutubeDL construction loads extractors and sets up an opener (~100 ms), so each
+# worker keeps a small pool of ready instances per option profile. An instance is
+# used by one thread at a time and is rebuilt after _YTDL_MAX_USES checkouts.
+_YTDL_POOL_SIZE = int(os.environ.get("VOXTEXT_YTDL_POOL_SIZE", "4"))
+_YTDL_MAX_USES = 200
+
+
+def _new_youtube_dl(opts):
+    """Build a YoutubeDL that shares _cookie_jar instead of keeping its own."""
+    ydl = yt_dlp.YoutubeDL(opts)
+    # `cookiejar` is a cached property; setting it before first use makes every
+    # request (and the request director built from it) go through the shared jar
+    ydl.__dict__["cookiejar"] = _cookie_jar
+    return ydl
+
+
+class _YoutubeDLPool:
+    """Checkout/checkin pool of YoutubeDL instances built from one option profile."""
+
+    def __init__(self, name, opts, size, max_uses=_YTDL_MAX_USES):
+        self.name = name
+        self.opts = opts
+        self.max_uses = max_uses
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._stats = {"constructed": 0, "constructSeconds": 0.0, "checkouts": 0,
+                       "waitSeconds": 0.0, "maxWaitSeconds": 0.0}
+
+    def _build(self):
+        started = time.perf_counter()
+        ydl = _new_youtube_dl(dict(self.opts))
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats["constructed"] += 1
+            self._stats["constructSeconds"] += elapsed
+        return [ydl, 0]
+
+    def warm(self):
+        """Build one instance ahead of the first request."""
+        with self._slots:
+            item = self._build()
+            with self._lock:
+                self._idle.append(item)
+
+    @contextlib.contextmanager
+    def checkout(self):
+        started = time.perf_counter()
+        self._slots.acquire()
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["waitSeconds"] += waited
+            self._stats["maxWaitSeconds"] = max(self._stats["maxWaitSeconds"], waited)
+            item = self._idle.pop() if self._idle else None
+        try:
+            if item is None:
+                item = self._build()
+            item[1] += 1
+            yield item[0]
+        finally:
+            if item is not None:
+                if item[1] >= self.max_uses:
+                    item[0].close()
+                else:
+                    with self._lock:
+                        self._idle.append(item)
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, idle=len(self._idle))
+        construct, wait = stats.pop("constructSeconds"), stats.pop("waitSeconds")
+        stats["avgConstructMs"] = round(construct / stats["constructed"] * 1000, 1) if stats["constructed"] else None
+        stats["avgWaitMs"] = round(wait / stats["checkouts"] * 1000, 2) if stats["checkouts"] else None
+        stats["maxWaitMs"] = round(stats.pop("maxWaitSeconds") * 1000, 2)
+        return stats
+
+
+# IMPORTANT:
+# Avoid forcing YouTube "player_client" variants here. It can drastically reduce the
+# returned format list (sometimes down to only storyboards / 360p), which breaks
+# /api/formats and /api/download in production.
+_ytdl_info_pool = _YoutubeDLPool("info", {
+    "quiet": True,
+    "no_warnings": True,
+    "skip_download": True,
+    "geo_bypass": True,
+    "ignore_no_formats_error": True,
+    "noplaylist": True,
+    "socket_timeout": 15,
+    "retries": 2,
+    "fragment_retries": 2,
+    "extractor_retries": 2,
+    "http_headers": _YTDL_HTTP_HEADERS,
+}, _YTDL_POOL_SIZE)
+# Plain URL fetches through yt-dlp's opener (caption fallback)
+_ytdl_fetch_pool = _YoutubeDLPool("fetch", {
+    "quiet": True,
+    "no_warnings": True,
+    "geo_bypass": True,
+    "noplaylist": True,
+    "socket_timeout": 15,
+    "http_headers": _YTDL_HTTP_HEADERS,
+}, _YTDL_POOL_SIZE)
+# Flat playlist listing for /api/batch: entries are read without resolving each video
+_ytdl_playlist_pool = _YoutubeDLPool("playlist", {
+    "quiet": True,
+    "no_warnings": True,
+    "skip_download": True,
+    "geo_bypass": True,
+    "extract_flat": "in_playlist",
+    "socket_timeout": 15,
+    "extractor_retries": 2,
+    "http_headers": _YTDL_HTTP_HEADERS,
+}, _YTDL_POOL_SIZE)
+_YTDL_POOLS = (_ytdl_info_pool, _ytdl_fetch_pool, _ytdl_playlist_pool)
+if os.environ.get("VOXTEXT_YTDL_PREWARM", "1") == "1":
+    threading.Thread(target=_ytdl_info_pool.warm, name="voxtext-ytdl-warm", daemon=True).start()
+
+
+def _extract_info_uncached(url):
+    """Run a full yt-dlp extraction and return its VideoSummary as a cacheable dict."""
+    with _ytdl_info_pool.checkout() as ydl:
         info = ydl.extract_info(url, download=False)
-        # Save cookies back to shared jar
-        if hasattr(ydl, 'cookiejar'):
-            for cookie in ydl.cookiejar:
-                _cookie_jar.set_cookie(cookie)
-    _info_cache[url] = {"info": info, "timestamp": now}
-    return info
-
-
-def _fetch_url_with_cookies(caption_url):
-    """Fetch a URL using the shared cookie jar from yt-dlp sessions."""
-    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(_cookie_jar))
-    req = urllib.request.Request(caption_url, headers={
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.5",
-        "Referer": "https://www.youtube.com/",
-        "Origin": "https://www.youtube.com",
-    })
-    with opener.open(req, timeout=15) as resp:
-        return resp.read().decode("utf-8")
+    return VideoSummary.from_info(info).to_dict()
+
+
+# Caption fetches go through one long-lived client: keep-alive connection pooling
+# (HTTP/2 via httpx when it and h2 are installed, requests otherwise), the shared
+# cookie jar, and a cap on concurrent requests per host.
+_HTTP_POOL_SIZE = int(os.environ.get("VOXTEXT_HTTP_POOL_SIZE", "16"))
+_HTTP_PER_HOST_LIMIT = int(os.environ.get("VOXTEXT_HTTP_PER_HOST_LIMIT", "8"))
+_CAPTION_FETCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Referer": "https://www.youtube.com/",
+    "Origin": "https://www.youtube.com",
+}
+
+
+class _PooledHttpClient:
+    """Thread-safe pooled HTTP client sharing a cookie jar, with per-host concurrency limits."""
+
+    def __init__(self, cookie_jar, headers, pool_size, per_host_limit, http2=None):
+        self.http2 = httpx is not None if http2 is None else http2
+        self.per_host_limit = per_host_limit
+        self._host_slots = {}
+        self._lock = threading.Lock()
+        if self.http2:
+            self.session = httpx.Client(
+                http2=True,
+                cookies=cookie_jar,
+                headers=headers,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            )
+        else:
+            self.session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+            self.session.cookies = cookie_jar
+            self.session.headers.update(headers)
+
+    def _slot(self, host):
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return slot
+
+    def iter_bytes(self, url, timeout=15):
+        """GET `url` and yield the body in chunks as it arrives; raises on HTTP errors.
+
+        The host slot is held until the generator is exhausted or closed.
+        """
+        with self._slot(urllib.parse.urlsplit(url).hostname):
+            if self.http2:
+                with self.session.stream("GET", url, timeout=timeout) as resp:
+                    resp.raise_for_status()
+                    yield from resp.iter_bytes(_CAPTION_CHUNK_SIZE)
+            else:
+                with self.session.get(url, timeout=timeout, stream=True) as resp:
+                    resp.raise_for_status()
+                    yield from resp.iter_content(_CAPTION_CHUNK_SIZE)
+
+
+_caption_http = _PooledHttpClient(
+    _cookie_jar, _CAPTION_FETCH_HEADERS, _HTTP_POOL_SIZE, _HTTP_PER_HOST_LIMIT
+)
+
+
+class _AsyncHttpClient:
+    """httpx.AsyncClient on the ASGI event loop, shared by handler threads.
+
+    Started by the ASGI lifespan (see asgi_app) when httpx is installed; under a
+    WSGI server it stays inactive and callers use their blocking clients instead.
+    """
+
+    def __init__(self, cookie_jar, pool_size, per_host_limit):
+        self.cookie_jar = cookie_jar
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit
+        self.loop = None
+        self.client = None
+        self._host_slots = {}
+
+    @property
+    def active(self):
+        return self.client is not None
+
+    async def start(self):
+        if httpx is None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.client = httpx.AsyncClient(
+            http2=True,
+            cookies=self.cookie_jar,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+        )
+
+    async def close(self):
+        client, self.client = self.client, None
+        if client is not None:
+            await client.aclose()
+
+    def _slot(self, url):
+        # Only touched from the loop thread, so no lock around the slot table
+        host = urllib.parse.urlsplit(url).hostname
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return slot
+
+    async def get(self, url, **kwargs):
+        async with self._slot(url):
+            return await self.client.get(url, **kwargs)
+
+    async def _pump(self, url, headers, timeout, chunks):
+        try:
+            async with self._slot(url):
+                async with self.client.stream("GET", url, headers=headers, timeout=timeout) as resp:
+                    resp.raise_for_status()
+                    async for chunk in resp.aiter_bytes():
+                        chunks.put(chunk)
+        finally:
+            chunks.put(None)
+
+    def iter_bytes(self, url, headers=None, timeout=15):
+        """Yield the body of `url` to a handler thread as it arrives.
+
+        One task on the loop reads the response with aiter_bytes and hands chunks
+        over a queue, so the caller starts parsing while the rest downloads.
+        HTTP errors are raised once the chunks received before them are consumed.
+        """
+        chunks = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(self._pump(url, headers, timeout, chunks), self.loop)
+        try:
+            while True:
+                try:
+                    chunk = chunks.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"No data from {urllib.parse.urlsplit(url).hostname} in {timeout}s")
+                if chunk is None:
+                    break
+                yield chunk
+            future.result(timeout)
+        finally:
+            future.cancel()
+
+    def run(self, coro, timeout=None):
+        """Run `coro` on the event loop from a handler thread and wait for the result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+
+_async_http = _AsyncHttpClient(_cookie_jar, _HTTP_POOL_SIZE, _HTTP_PER_HOST_LIMIT)
 
 
-def _fetch_url_via_ytdlp(caption_url):
-    """Fetch a caption URL using yt-dlp's HTTP handler.
+def _iter_url_with_cookies(caption_url):
+    """Stream a URL's body in chunks using the shared cookie jar from yt-dlp sessions."""
+    if _async_http.active:
+        return _async_http.iter_bytes(caption_url, headers=_CAPTION_FETCH_HEADERS)
+    return _caption_http.iter_bytes(caption_url)
+
+
+# /api/metadata only reads title, channel, duration, language hints and the caption
+# track lists, so it skips what the full extraction spends most of its time on:
+# the player JS download and signature/n-parameter solving, the DASH/HLS manifest
+# fetches, and YoutubeDL's format sorting and selection (process=False).
+_LITE_EXTRACTOR_ARGS = {"youtube": {"skip": ["dash", "hls"], "player_skip": ["js"]}}
+_ytdl_lite_pool = _YoutubeDLPool("lite", {
+    **_ytdl_info_pool.opts,
+    "extractor_args": _LITE_EXTRACTOR_ARGS,
+}, _YTDL_POOL_SIZE)
+_YTDL_POOLS += (_ytdl_lite_pool,)
+
+
+def _best_thumbnail(thumbnails):
+    """The thumbnail YoutubeDL would pick: highest preference, then largest."""
+    best = max(thumbnails or (), default=None, key=lambda t: (
+        t.get("preference") if t.get("preference") is not None else -1, t.get("width") or 0, t.get("height") or 0,
+    ))
+    return best.get("url") if best else None
+
+
+def _extract_lite_info_uncached(url):
+    """Metadata-only extraction; returns a VideoSummary dict without formats.
+
+    Falls back to the full extraction if the unprocessed result is not a single
+    video with a title (e.g. a URL the extractor only resolves to another URL).
+    """
+    with _ytdl_lite_pool.checkout() as ydl:
+        info = ydl.extract_info(url, download=False, process=False)
+    if info.get("_type", "video") != "video" or not info.get("title"):
+        return _extract_info_cached(url).to_dict()
+    # Fields YoutubeDL fills in while processing
+    if not info.get("thumbnail"):
+        info["thumbnail"] = _best_thumbnail(info.get("thumbnails"))
+    if info.get("is_live") is None:
+        info["is_live"] = info.get("live_status") == "is_live"
+    # Unprocessed formats are unsorted and partly unresolved, so none are summarized
+    return VideoSummary.from_info(info, with_formats=False).to_dict()
+
+
+def _iter_url_via_ytdlp(caption_url):
+    """Stream a caption URL in chunks using yt-dlp's HTTP handler.
     Uses yt-dlp's internal opener which handles cookies, auth tokens,
     and YouTube-specific headers better than raw urllib."""
-    cookies_path = os.path.join(os.path.dirname(__file__), "youtube_cookies.txt")
-    ydl_opts = {
-        "quiet": True,
-        "no_warnings": True,
-        "geo_bypass": True,
-        "noplaylist": True,
-        "socket_timeout": 15,
-        "http_headers": {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/121.0.0.0 Safari/537.36"
-            ),
-            "Accept-Language": "en-US,en;q=0.9",
-        },
-    }
-    if os.path.exists(cookies_path):
-        ydl_opts["cookiefile"] = cookies_path
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        if hasattr(ydl, 'cookiejar'):
-            for cookie in _cookie_jar:
-                ydl.cookiejar.set_cookie(cookie)
-        response = ydl.urlopen(caption_url)
-        content = response.read().decode("utf-8")
-        if hasattr(ydl, 'cookiejar'):
-            for cookie in ydl.cookiejar:
-                _cookie_jar.set_cookie(cookie)
-        return content
+    with _ytdl_fetch_pool.checkout() as ydl:
+        with ydl.urlopen(caption_url) as response:
+            yield from iter(lambda: response.read(_CAPTION_CHUNK_SIZE), b"")
 
 
-def _parse_caption_content(raw):
-    """Parse json3 or VTT caption content into timed segments."""
-    segments = []
+def _iter_caption_body(caption_url):
+    """Stream a caption body, falling back to yt-dlp when the pooled client gets an empty one."""
+    chunks = _iter_url_with_cookies(caption_url)
     try:
-        caption_data = json_lib.loads(raw)
-        events = caption_data.get("events", [])
-        for event in events:
-            start_ms = event.get("tStartMs", 0)
-            dur_ms = event.get("dDurMs", 0)
-            segs = event.get("segs")
-            if not segs:
+        for chunk in chunks:
+            if chunk:
+                yield chunk
+                break
+        else:
+            yield from _iter_url_via_ytdlp(caption_url)
+            return
+        yield from chunks
+    finally:
+        chunks.close()
+
+
+# Caption documents are parsed as a stream: the format is sniffed from the first
+# bytes and segments are yielded as soon as each event/cue is complete, so a
+# multi-hour transcript never exists as one decoded JSON tree.
+_CAPTION_CHUNK_SIZE = 64 * 1024
+# [[h:]m:]s[.fraction] as used by VTT cues and TTML clock times
+_CAPTION_TIMESTAMP_RE = re.compile(r'(?:(\d+):)?(\d+):(\d+)(?:[.,](\d+))?')
+_TTML_OFFSET_RE = re.compile(r'([\d.]+)(h|m|s|ms)')
+_TTML_OFFSET_MS = {"h": 3600000, "m": 60000, "s": 1000, "ms": 1}
+
+
+def _caption_text_chunks(chunks):
+    """Decode an iterable of bytes/str chunks to str chunks of bounded size."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for chunk in chunks:
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            chunk = decoder.decode(chunk)
+        for start in range(0, len(chunk), _CAPTION_CHUNK_SIZE):
+            yield chunk[start:start + _CAPTION_CHUNK_SIZE]
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _caption_timestamp_to_ms(ts):
+    match = _CAPTION_TIMESTAMP_RE.fullmatch(ts)
+    if not match:
+        return 0
+    h, m, s, frac = match.groups()
+    return (int(h or 0) * 3600 + int(m) * 60 + int(s)) * 1000 + int((frac or "0").ljust(3, "0")[:3])
+
+
+def _ttml_time_to_ms(value):
+    """TTML times are clock values (00:00:01.500) or offsets (1.5s, 1500ms)."""
+    if not value:
+        return 0
+    match = _TTML_OFFSET_RE.fullmatch(value.strip())
+    if match:
+        return int(float(match.group(1)) * _TTML_OFFSET_MS[match.group(2)])
+    return _caption_timestamp_to_ms(value.strip())
+
+
+class _JsonStream:
+    """Pull JSON values one at a time from a chunked text stream."""
+
+    def __init__(self, text_chunks, buf=""):
+        self.chunks = text_chunks
+        self.buf = buf
+        self.pos = 0
+        self.exhausted = False
+        self.decoder = json_lib.JSONDecoder()
+        self._batch_failed = False
+
+    def _more(self):
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            return False
+        # Drop consumed text so the buffer only holds the value being decoded
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self._batch_failed = False
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character ('' at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in json3 captions")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if self._more():
+                    continue
+                raise
+            # A number can stop at the chunk boundary; make sure it is complete
+            if end == len(self.buf) and not self.exhausted and self._more():
+                continue
+            self.pos = end
+            return value
+
+    def _batch(self, first_key):
+        """Decode the complete array elements at the front of the buffer with one
+        json.loads call, or return None.
+
+        The last element in the buffer is found from `first_key`, the key each
+        element starts with (tried for the last two occurrences); everything before
+        its "{" is parsed as one array. A guess inside a string or a nested value
+        leaves the slice unbalanced, so it fails to parse, and the caller then
+        decodes one value at a time until more data arrives.
+        """
+        if self._batch_failed:
+            return None
+        end = len(self.buf)
+        for _ in range(2):
+            key_at = self.buf.rfind(first_key, self.pos, end)
+            start = self.buf.rfind("{", self.pos, key_at) if key_at != -1 else -1
+            if start <= self.pos:
+                break
+            head = self.buf[self.pos:start].rstrip()
+            if head.endswith(","):
+                try:
+                    values = json_lib.loads("[" + head[:-1] + "]")
+                except ValueError:
+                    values = None
+                if values is not None:
+                    self.pos = start
+                    return values
+            end = start
+        self._batch_failed = True
+        return None
+
+    def elements(self, first_key):
+        """Yield the elements of the array whose "[" was just consumed; see _batch."""
+        while self.peek() not in ("]", ""):
+            values = self._batch(first_key)
+            if values is not None:
+                yield from values
+                continue
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+
+
+def _iter_json3_segments(text_chunks, head):
+    stream = _JsonStream(text_chunks, head)
+    stream.expect("{")
+    while stream.peek() not in ("}", ""):
+        key = stream.value()
+        stream.expect(":")
+        if key != "events" or stream.peek() != "[":
+            stream.value()  # Skip pens, window styles, etc.
+        else:
+            stream.expect("[")
+            # Events start with their tStartMs key (a miss only costs speed)
+            for event in stream.elements('"tStartMs"'):
+                if not isinstance(event, dict):
+                    continue
+                segs = event.get("segs")
+                if not segs:
+                    continue
+                text = "".join(s.get("utf8", "") for s in segs).strip()
+                text = text.replace("\n", " ")
+                if not text:
+                    continue
+                start_ms = event.get("tStartMs", 0)
+                yield {
+                    "startMs": start_ms,
+                    "endMs": start_ms + event.get("dDurMs", 0),
+                    "text": text,
+                }
+            stream.expect("]")
+        if stream.peek() == ",":
+            stream.pos += 1
+
+
+def _iter_text_lines(text_chunks, head):
+    pending = head
+    for chunk in text_chunks:
+        # Chunks are bounded, so splitting each one keeps memory bounded too
+        lines = (pending + chunk).split("\n")
+        pending = lines.pop()
+        yield from lines
+    yield from pending.split("\n")
+
+
+def _iter_vtt_segments(text_chunks, head):
+    cue = None
+    for line in _iter_text_lines(text_chunks, head):
+        line = line.strip()
+        if cue is not None:
+            if line:
+                cue[2].append(line)
                 continue
-            text = "".join(s.get("utf8", "") for s in segs).strip()
-            text = text.replace("\n", " ")
-            if not text:
+            if cue[2]:
+                yield {"startMs": cue[0], "endMs": cue[1], "text": " ".join(cue[2])}
+            cue = None
+        elif "-->" in line:
+            start_str, _, rest = line.partition("-->")
+            end_str = rest.strip().split(" ")[0]
+            cue = (_caption_timestamp_to_ms(start_str.strip()), _caption_timestamp_to_ms(end_str), [])
+    if cue is not None and cue[2]:
+        yield {"startMs": cue[0], "endMs": cue[1], "text": " ".join(cue[2])}
+
+
+def _iter_xml_segments(text_chunks, head):
+    """SRV3 (<p t= d=> in ms), SRV1 (<text start= dur=> in s) and TTML (<p begin= end=>)."""
+    parser = ET.XMLPullParser(events=("end",))
+    for chunk in itertools.chain((head,), text_chunks):
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if tag not in ("p", "text"):
                 continue
-            segments.append({
-                "startMs": start_ms,
-                "endMs": start_ms + dur_ms,
-                "text": text,
-            })
-    except (json_lib.JSONDecodeError, KeyError):
-        # Fallback: try parsing as VTT
-        lines = raw.strip().split("\n")
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            if "-->" in line:
-                parts = line.split("-->")
-                start_str = parts[0].strip()
-                end_str = parts[1].strip().split(" ")[0]
-
-                def vtt_to_ms(ts):
-                    ts_parts = ts.replace(",", ".").split(":")
-                    if len(ts_parts) == 3:
-                        h, m, rest = ts_parts
-                        s_parts = rest.split(".")
-                        s = s_parts[0]
-                        ms = s_parts[1] if len(s_parts) > 1 else "0"
-                    elif len(ts_parts) == 2:
-                        h = "0"
-                        m = ts_parts[0]
-                        rest = ts_parts[1]
-                        s_parts = rest.split(".")
-                        s = s_parts[0]
-                        ms = s_parts[1] if len(s_parts) > 1 else "0"
-                    else:
-                        return 0
-                    return (int(h) * 3600 + int(m) * 60 + int(s)) * 1000 + int(ms.ljust(3, "0")[:3])
-
-                start_ms = vtt_to_ms(start_str)
-                end_ms = vtt_to_ms(end_str)
-                text_lines = []
-                i += 1
-                while i < len(lines) and lines[i].strip():
-                    text_lines.append(lines[i].strip())
-                    i += 1
-                text = " ".join(text_lines)
-                if text:
-                    segments.append({
-                        "startMs": start_ms,
-                        "endMs": end_ms,
-                        "text": text,
-                    })
-            i += 1
-    return segments
+            attrs = elem.attrib
+            if "t" in attrs:
+                start_ms = int(attrs["t"])
+                end_ms = start_ms + int(attrs.get("d", 0))
+            elif "start" in attrs:
+                start_ms = int(float(attrs["start"]) * 1000)
+                end_ms = start_ms + int(float(attrs.get("dur", 0)) * 1000)
+            else:
+                start_ms = _ttml_time_to_ms(attrs.get("begin"))
+                end_ms = _ttml_time_to_ms(attrs.get("end")) if "end" in attrs else \
+                    start_ms + _ttml_time_to_ms(attrs.get("dur"))
+            for child in elem.iter():
+                if child.tag.rsplit("}", 1)[-1] == "br":
+                    child.tail = " " + (child.tail or "")
+            text = " ".join("".join(elem.itertext()).split())
+            if tag == "text":
+                text = html.unescape(text)  # SRV1 escapes entities twice
+            elem.clear()
+            if text:
+                yield {"startMs": start_ms, "endMs": end_ms, "text": text}
+    parser.close()
+
+
+def iter_caption_segments(chunks):
+    """Yield timed segments from json3, VTT or SRV3/TTML caption content.
+
+    `chunks` is an iterable of bytes or str pieces (e.g. a response read in
+    blocks); the format is detected from the first non-blank characters.
+    """
+    text_chunks = _caption_text_chunks(chunks)
+    head = ""
+    for chunk in text_chunks:
+        head += chunk
+        if head.lstrip("\ufeff \t\r\n"):
+            break
+    head = head.lstrip("\ufeff")
+    first = head.lstrip()[:1]
+    if first == "{":
+        parse = _iter_json3_segments
+    elif first == "<":
+        parse = _iter_xml_segments
+    else:
+        parse = _iter_vtt_segments
+    try:
+        yield from parse(text_chunks, head)
+    except (ValueError, ET.ParseError) as e:
+        # Malformed or truncated content: keep what was parsed so far
+        print(f"[captions] Stopped parsing malformed caption content: {e}")
 
 
-def _translate_text_google(text, source_lang, target_lang):
-    """Translate text using Google Translate free API (translate.googleapis.com)."""
-    encoded = urllib.parse.quote(text)
-    api_url = (
-        f"https://translate.googleapis.com/translate_a/single"
-        f"?client=gtx&sl={source_lang}&tl={target_lang}&dt=t&q={encoded}"
-    )
-    req = urllib.request.Request(api_url, headers={
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-    })
-    with urllib.request.urlopen(req, timeout=15) as resp:
-        data = json_lib.loads(resp.read().decode("utf-8"))
+def _parse_caption_content(raw):
+    """Parse json3, VTT or SRV3/TTML caption content into timed segments."""
+    return list(iter_caption_segments((raw,)))
+
+
+class SegmentStore:
+    """Caption segments held as columns: start/end times in array('q'), texts in a list.
+
+    Avoids one dict per segment for long transcripts. Cached payloads keep the
+    `to_columns()` form; responses expand to rows or pack to binary on demand.
+    """
+
+    __slots__ = ("starts", "ends", "texts")
+
+    def __init__(self):
+        self.starts = array("q")
+        self.ends = array("q")
+        self.texts = []
+
+    @classmethod
+    def from_segments(cls, segments):
+        """Build from row dicts, a `to_columns()` dict or another store."""
+        store = cls()
+        if isinstance(segments, SegmentStore):
+            return segments
+        if isinstance(segments, dict):
+            store.starts.extend(segments["startMs"])
+            store.ends.extend(segments["endMs"])
+            store.texts.extend(segments["text"])
+            return store
+        for seg in segments:
+            store.append(seg["startMs"], seg["endMs"], seg["text"])
+        return store
+
+    def append(self, start_ms, end_ms, text):
+        self.starts.append(start_ms)
+        self.ends.append(end_ms)
+        self.texts.append(text)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __iter__(self):
+        for start_ms, end_ms, text in zip(self.starts, self.ends, self.texts):
+            yield {"startMs": start_ms, "endMs": end_ms, "text": text}
+
+    def to_rows(self):
+        return list(self)
+
+    def to_columns(self):
+        return {"startMs": self.starts.tolist(), "endMs": self.ends.tolist(), "text": list(self.texts)}
+
+    def to_binary(self):
+        """Length-prefixed binary: u32 count, int64 starts, int64 ends, then u32 length + UTF-8 per text."""
+        starts, ends = self.starts, self.ends
+        if sys.byteorder == "big":
+            starts, ends = array("q", starts), array("q", ends)
+            starts.byteswap()
+            ends.byteswap()
+        parts = [struct.pack("<I", len(self)), starts.tobytes(), ends.tobytes()]
+        for text in self.texts:
+            encoded = text.encode("utf-8")
+            parts.append(struct.pack("<I", len(encoded)))
+            parts.append(encoded)
+        return b"".join(parts)
+
+
+# Google Translate batches go out concurrently over one pooled keep-alive session.
+# A token bucket spaces requests out and 429/5xx answers are retried with backoff,
+# so parallelism does not turn into throttling by the free endpoint.
+_TRANSLATE_URL = "https://translate.googleapis.com/translate_a/single"
+_TRANSLATE_CONCURRENCY = int(os.environ.get("VOXTEXT_TRANSLATE_CONCURRENCY", "4"))
+_TRANSLATE_RATE = float(os.environ.get("VOXTEXT_TRANSLATE_RATE", "5"))  # Requests per second
+_TRANSLATE_MAX_RETRIES = 3
+_TRANSLATE_MAX_SEGMENTS = 20000
+_translate_session = requests.Session()
+_translate_session.mount("https://", requests.adapters.HTTPAdapter(
+    pool_connections=1, pool_maxsize=_TRANSLATE_CONCURRENCY, max_retries=0,
+))
+_TRANSLATE_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+_translate_session.headers.update(_TRANSLATE_HEADERS)
+_translate_executor = ThreadPoolExecutor(max_workers=_TRANSLATE_CONCURRENCY, thread_name_prefix="voxtext-translate")
+
+
+class _RateLimiter:
+    """Thread-safe token bucket: `rate` acquisitions per second, bursts up to `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token, possibly ahead of time; returns the seconds to wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate) - 1
+            self.updated = now
+            return max(0.0, -self.tokens / self.rate)
+
+    def acquire(self):
+        time.sleep(self.reserve())
+
+
+_translate_limiter = _RateLimiter(_TRANSLATE_RATE, burst=_TRANSLATE_CONCURRENCY)
+
+
+def _translate_params(text, source_lang, target_lang):
+    return {"client": "gtx", "sl": source_lang, "tl": target_lang, "dt": "t", "q": text}
+
+
+def _translate_retry_delay(resp, attempt):
+    """Seconds to wait before retrying a 429/5xx answer, or None if `resp` is final.
+
+    Raises once the retries are used up.
+    """
+    if resp.status_code != 429 and resp.status_code < 500:
+        return None
+    if attempt == _TRANSLATE_MAX_RETRIES:
+        resp.raise_for_status()
+    # Honour Retry-After when given, else exponential backoff with jitter
+    retry_after = resp.headers.get("Retry-After", "")
+    delay = float(retry_after) if retry_after.isdigit() else (2 ** attempt) + random.random()
+    return min(delay, 30)
+
+
+def _translated_text(resp):
+    resp.raise_for_status()
+    data = resp.json()
     # Response format: [[["translated", "original", ...], ...], ...]
     return "".join(part[0] for part in data[0] if part[0])
 
 
+def _translate_text_google(text, source_lang, target_lang):
+    """Translate text using Google Translate free API (translate.googleapis.com)."""
+    for attempt in range(_TRANSLATE_MAX_RETRIES + 1):
+        _translate_limiter.acquire()
+        resp = _translate_session.get(
+            _TRANSLATE_URL, params=_translate_params(text, source_lang, target_lang), timeout=15,
+        )
+        delay = _translate_retry_delay(resp, attempt)
+        if delay is None:
+            return _translated_text(resp)
+        resp.close()
+        time.sleep(delay)
+
+
+async def _translate_text_google_async(text, source_lang, target_lang):
+    """_translate_text_google over the ASGI loop's async client."""
+    for attempt in range(_TRANSLATE_MAX_RETRIES + 1):
+        await asyncio.sleep(_translate_limiter.reserve())
+        resp = await _async_http.get(
+            _TRANSLATE_URL, params=_translate_params(text, source_lang, target_lang),
+            headers=_TRANSLATE_HEADERS, timeout=15,
+        )
+        delay = _translate_retry_delay(resp, attempt)
+        if delay is None:
+            return _translated_text(resp)
+        await asyncio.sleep(delay)
+
+
+def _split_translation(batch, result):
+    """Split a batch translation into lines. Returns (texts, aligned).
+
+    aligned is False when Google Translate merged or split lines, so the lines
+    may not match the texts they are paired with.
+    """
+    parts = result.split("\n")
+    aligned = len(parts) == len(batch)
+    # Pad if Google Translate merged some lines
+    while len(parts) < len(batch):
+        parts.append(batch[len(parts)])
+    return parts[:len(batch)], aligned
+
+
+def _translate_batch(batch, source_lang, target_lang):
+    """Translate one batch of texts. Returns (texts, ok); on failure keeps the originals.
+
+    ok is only True when each returned line lines up with its source text.
+    """
+    try:
+        return _split_translation(batch, _translate_text_google("\n".join(batch), source_lang, target_lang))
+    except Exception as e:
+        print(f"[translate] Batch failed ({len(batch)} segments): {e}")
+        # If translation fails for this batch, keep original texts
+        return batch, False
+
+
+async def _translate_batches_async(batches, source_lang, target_lang):
+    """Translate batches on the event loop, _TRANSLATE_CONCURRENCY at a time, in order."""
+    slots = asyncio.Semaphore(_TRANSLATE_CONCURRENCY)
+
+    async def translate(batch):
+        async with slots:
+            try:
+                result = await _translate_text_google_async("\n".join(batch), source_lang, target_lang)
+            except Exception as e:
+                print(f"[translate] Batch failed ({len(batch)} segments): {e}")
+                return batch, False
+        return _split_translation(batch, result)
+
+    return await asyncio.gather(*(translate(batch) for batch in batches))
+
+
+def _normalize_segment_text(text):
+    """Canonical form used as the translation-memory key (NFC, collapsed whitespace)."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def _translation_memory_key(text, source_lang, target_lang):
+    return hashlib.sha1(f"{source_lang}\0{target_lang}\0{text}".encode("utf-8")).hexdigest()
+
+
 def _translate_segments(segments, source_lang, target_lang):
-    """Translate caption segments in batches using Google Translate."""
-    texts = [seg["text"] for seg in segments]
+    """Translate caption segments in batches using Google Translate.
+
+    Each distinct text is looked up in the translation memory first; only misses are
+    sent. Returns (translated_segments, stats) where stats counts distinct texts.
+    """
+    texts = [_normalize_segment_text(seg["text"]) for seg in segments]
+    unique = {text: _translation_memory_key(text, source_lang, target_lang) for text in texts if text}
+    remembered = _translation_memory.get_many(unique.values())
+    translations = {text: remembered[key] for text, key in unique.items() if key in remembered}
+    pending = [text for text in unique if text not in translations]
 
     # Batch texts by URL-encoded length to stay within Google Translate URL limits.
     # Non-Latin chars (Hindi, Tamil etc.) expand 3-9x when URL-encoded,
@@ -321,7 +1973,7 @@ def _translate_segments(segments, source_lang, target_lang):
     current_batch = []
     current_encoded_len = 0
 
-    for text in texts:
+    for text in pending:
         text_encoded_len = len(urllib.parse.quote(text))
         if current_encoded_len + text_encoded_len + 3 > MAX_ENCODED_LEN and current_batch:
             batches.append(current_batch)
@@ -333,30 +1985,37 @@ def _translate_segments(segments, source_lang, target_lang):
     if current_batch:
         batches.append(current_batch)
 
-    translated_texts = []
-    for batch in batches:
-        combined = "\n".join(batch)
-        try:
-            result = _translate_text_google(combined, source_lang, target_lang)
-            parts = result.split("\n")
-            # Pad if Google Translate merged some lines
-            while len(parts) < len(batch):
-                parts.append(batch[len(parts)])
-            translated_texts.extend(parts[:len(batch)])
-        except Exception as e:
-            print(f"[translate] Batch failed ({len(batch)} segments): {e}")
-            # If translation fails for this batch, keep original texts
-            translated_texts.extend(batch)
+    # Batches run in parallel and results come back in submission order. Under the
+    # ASGI server they run on the event loop instead of the translate thread pool.
+    if _async_http.active:
+        results = _async_http.run(_translate_batches_async(batches, source_lang, target_lang))
+    else:
+        results = _translate_executor.map(lambda b: _translate_batch(b, source_lang, target_lang), batches)
+    learned = {}
+    for batch, (parts, ok) in zip(batches, results):
+        for text, translated in zip(batch, parts):
+            translations[text] = translated.strip()
+            if ok:
+                learned[unique[text]] = translated.strip()
+    # Failed and misaligned batches are not remembered, so they are retried next time
+    _translation_memory.set_many(learned)
 
     # Build translated segments preserving timing
     translated_segments = []
-    for i, seg in enumerate(segments):
+    for seg, text in zip(segments, texts):
         translated_segments.append({
             "startMs": seg["startMs"],
             "endMs": seg["endMs"],
-            "text": translated_texts[i].strip() if i < len(translated_texts) else seg["text"],
+            "text": translations.get(text, seg["text"]),
         })
-    return translated_segments
+    lookups = len(unique)
+    stats = {
+        "unique": lookups,
+        "hits": len(remembered),
+        "misses": lookups - len(remembered),
+        "hitRatio": round(len(remembered) / lookups, 4) if lookups else None,
+    }
+    return translated_segments, stats
 
 
 # Language code to readable name mapping
@@ -414,6 +2073,46 @@ def resolve_language(code):
     return LANGUAGE_MAP.get(normalized) or LANGUAGE_MAP.get(normalized.split("-")[0])
 
 
+# Language-name patterns are compiled once. Each one is a single alternation in
+# priority order (longest name first), wrapped in a lookahead so finditer() visits
+# every position in one pass; the lowest-ranked name found wins, exactly as if each
+# name were tried in turn.
+_LANGUAGE_NAMES_BY_LENGTH = sorted(LANGUAGE_NAMES, key=lambda name: -len(name))
+_LANGUAGE_NAME_RANK = {name: rank for rank, name in enumerate(_LANGUAGE_NAMES_BY_LENGTH)}
+_LANGUAGE_NAME_ALTERNATION = "|".join(re.escape(name) for name in _LANGUAGE_NAMES_BY_LENGTH)
+# "Learn Japanese through Tamil" -> Tamil
+_TITLE_MEDIUM_RE = re.compile(
+    r'(?=(?:through|thru|via)\s+(' + _LANGUAGE_NAME_ALTERNATION + r')(?:[\s\.\,\|\)\]!?]|$))'
+)
+# Hashtags like #englishthroughtamil
+_HASHTAG_RE = re.compile(r'#(\w+)')
+_HASHTAG_MEDIUM_RE = re.compile(r'(?=(?:through|thru|via)(' + _LANGUAGE_NAME_ALTERNATION + r')$)')
+# "| Tamil |", "| Tamil", "(Tamil)", "in Tamil", "- Tamil"
+_TITLE_MENTION_RE = re.compile(
+    r'(?:^|(?<=[\|\(\[\-–—,\s]))(?=(' + _LANGUAGE_NAME_ALTERNATION + r')(?:[\|\)\]\-–—,\s]|$))'
+)
+# Whitespace-delimited mentions in tags. A match reports the longest name at each
+# position, so names that are whole-word prefixes of it ("brazilian" in "brazilian
+# portuguese") are counted alongside it.
+_TAG_MENTION_RE = re.compile(r'(?:^|(?<=\s))(?=(' + _LANGUAGE_NAME_ALTERNATION + r')(?:\s|$))')
+_LANGUAGE_NAME_ORDER = {name: index for index, name in enumerate(LANGUAGE_NAMES)}
+_TAG_PREFIX_NAMES = {
+    name: [other for other in LANGUAGE_NAMES
+           if len(other) < len(name) and name.startswith(other) and name[len(other)].isspace()]
+    for name in LANGUAGE_NAMES
+}
+
+
+def _best_language_match(pattern, text):
+    """Return the readable language for the highest-priority name `pattern` finds in `text`."""
+    best = None
+    for match in pattern.finditer(text):
+        rank = _LANGUAGE_NAME_RANK[match.group(1)]
+        if best is None or rank < best:
+            best = rank
+    return LANGUAGE_NAMES[_LANGUAGE_NAMES_BY_LENGTH[best]] if best is not None else None
+
+
 def detect_language_from_title(title):
     """Scan the video title for explicit language mentions like '| Tamil |' or 'in Hindi'."""
     if not title:
@@ -422,26 +2121,18 @@ def detect_language_from_title(title):
 
     # Priority 1: Contextual "through/via [language]" with spaces
     # e.g. "Learn Japanese through Tamil" → spoken language is Tamil
-    for lang_name, readable in sorted(LANGUAGE_NAMES.items(), key=lambda x: -len(x[0])):
-        medium_pattern = r'(?:through|thru|via)\s+' + re.escape(lang_name) + r'(?:[\s\.\,\|\)\]!?]|$)'
-        if re.search(medium_pattern, title_lower):
-            return readable
+    found = _best_language_match(_TITLE_MEDIUM_RE, title_lower)
+    if found:
+        return found
 
     # Priority 2: Hashtag parsing for compound words like #englishthroughtamil
-    hashtags = re.findall(r'#(\w+)', title_lower)
-    for hashtag in hashtags:
-        for lang_name, readable in sorted(LANGUAGE_NAMES.items(), key=lambda x: -len(x[0])):
-            # Match "through/thru/via" + language inside hashtag
-            ht_pattern = r'(?:through|thru|via)' + re.escape(lang_name) + r'$'
-            if re.search(ht_pattern, hashtag):
-                return readable
+    for hashtag in _HASHTAG_RE.findall(title_lower):
+        found = _best_language_match(_HASHTAG_MEDIUM_RE, hashtag)
+        if found:
+            return found
 
     # Priority 3: General patterns: "| Tamil |", "| Tamil", "(Tamil)", "in Tamil", "- Tamil"
-    for lang_name, readable in sorted(LANGUAGE_NAMES.items(), key=lambda x: -len(x[0])):
-        pattern = r'(?:^|[\|\(\[\-–—,\s])' + re.escape(lang_name) + r'(?:[\|\)\]\-–—,\s]|$)'
-        if re.search(pattern, title_lower):
-            return readable
-    return None
+    return _best_language_match(_TITLE_MENTION_RE, title_lower)
 
 
 # Unicode script ranges for detecting non-Latin text in titles
@@ -471,15 +2162,47 @@ SCRIPT_LANGUAGE_MAP = {
 }
 
 
-def detect_language_from_script(title):
-    """Detect language from non-Latin script characters in the title."""
-    if not title:
+# Sorted range table over SCRIPT_LANGUAGE_MAP for bisect lookups. Katakana is added
+# so katakana-only titles are recognised as Japanese as well.
+_SCRIPT_RANGES = sorted(
+    [(start, end, lang) for lang, (start, end) in SCRIPT_LANGUAGE_MAP.items()]
+    + [(0x30A0, 0x30FF, "Japanese")]
+)
+_SCRIPT_RANGE_STARTS = [start for start, _, _ in _SCRIPT_RANGES]
+_SCRIPT_PRIORITY = {lang: rank for rank, lang in enumerate(SCRIPT_LANGUAGE_MAP)}
+_FIRST_SCRIPT_CODEPOINT = _SCRIPT_RANGE_STARTS[0]
+
+
+def script_histogram(text):
+    """Count the characters of `text` per non-Latin script (keys as in SCRIPT_LANGUAGE_MAP).
+
+    Each distinct character is classified once, so this stays cheap on long
+    descriptions and caption text.
+    """
+    if not text or text.isascii():
+        return {}
+    histogram = {}
+    for ch, count in Counter(text).items():
+        cp = ord(ch)
+        if cp < _FIRST_SCRIPT_CODEPOINT:
+            continue
+        index = bisect.bisect_right(_SCRIPT_RANGE_STARTS, cp) - 1
+        start, end, lang = _SCRIPT_RANGES[index]
+        if cp <= end:
+            histogram[lang] = histogram.get(lang, 0) + count
+    return histogram
+
+
+def detect_language_from_script(text):
+    """Detect language from the dominant non-Latin script in a title (or any text)."""
+    histogram = script_histogram(text)
+    if not histogram:
         return None
-    for lang, (start, end) in SCRIPT_LANGUAGE_MAP.items():
-        for ch in title:
-            if start <= ord(ch) <= end:
-                return lang
-    return None
+    # Kanji next to kana is Japanese, not Chinese
+    if "Japanese" in histogram and "Chinese" in histogram:
+        histogram["Japanese"] += histogram.pop("Chinese")
+    # Most characters wins; ties go to the earlier SCRIPT_LANGUAGE_MAP entry
+    return min(histogram, key=lambda lang: (-histogram[lang], _SCRIPT_PRIORITY[lang]))
 
 
 def detect_language_from_tags(tags):
@@ -489,11 +2212,14 @@ def detect_language_from_tags(tags):
     # Count how many tags mention each language
     lang_counts = {}
     for tag in tags:
-        tag_lower = tag.lower()
-        for lang_name, readable in LANGUAGE_NAMES.items():
-            pattern = r'(?:^|[\s])' + re.escape(lang_name) + r'(?:[\s]|$)'
-            if re.search(pattern, tag_lower):
-                lang_counts[readable] = lang_counts.get(readable, 0) + 1
+        names = set()
+        for match in _TAG_MENTION_RE.finditer(tag.lower()):
+            names.add(match.group(1))
+            names.update(_TAG_PREFIX_NAMES[match.group(1)])
+        # Count in LANGUAGE_NAMES order so ties resolve as before
+        for name in sorted(names, key=_LANGUAGE_NAME_ORDER.get):
+            readable = LANGUAGE_NAMES[name]
+            lang_counts[readable] = lang_counts.get(readable, 0) + 1
     if not lang_counts:
         return None
     # Return the most frequently mentioned language (ignore English since
@@ -504,6 +2230,27 @@ def detect_language_from_tags(tags):
     return max(lang_counts, key=lang_counts.get)
 
 
+# Explicit language mentions in descriptions/channel names, in priority order
+DESCRIPTION_LANGUAGE_KEYWORDS = {
+    "Tamil": ["tamil", "தமிழ்", " ta ", " tn "],
+    "Telugu": ["telugu", "తెలుగు", " te ", " ap ", " telangana"],
+    "Hindi": ["hindi", "हिन्दी", " hi "],
+    "Kannada": ["kannada", "ಕನ್ನಡ", " kn ", " karnataka"],
+    "Malayalam": ["malayalam", "മലയാളം", " ml ", " kerala"],
+    "Bengali": ["bengali", "bangla", "বাংলা", " bn ", " wb "],
+    "Marathi": ["marathi", "मराठी", " mr ", " maharashtra"],
+    "Gujarati": ["gujarati", "ગુજરાતી", " gu "],
+    "Punjabi": ["punjabi", "ਪੰਜਾਬੀ", " pa "],
+    "Sanskrit": ["sanskrit", "संस्कृत", " sa "],
+}
+# Deity names that hint at South Indian devotional content
+SOUTH_INDIAN_DEITIES = (
+    "venkateshwara", "venkateswara", "balaji", "tirupati",  # Tamil/Telugu
+    "murugan", "subrahmanya", "ayyappa", "meenakshi",  # Tamil
+    "vishnu", "shiva", "krishna", "rama",  # Pan-Indian but common in South
+)
+
+
 def detect_language_from_description(description, channel):
     """Detect language from video description and channel name.
     Looks for explicit language mentions in description."""
@@ -512,24 +2259,9 @@ def detect_language_from_description(description, channel):
 
     combined_text = f"{description or ''} {channel or ''}".lower()
 
-    # Check for explicit language mentions in description/channel
-    # Priority order: explicit mentions first
-    language_keywords = {
-        "Tamil": ["tamil", "தமிழ்", " ta ", " tn "],
-        "Telugu": ["telugu", "తెలుగు", " te ", " ap ", " telangana"],
-        "Hindi": ["hindi", "हिन्दी", " hi "],
-        "Kannada": ["kannada", "ಕನ್ನಡ", " kn ", " karnataka"],
-        "Malayalam": ["malayalam", "മലയാളം", " ml ", " kerala"],
-        "Bengali": ["bengali", "bangla", "বাংলা", " bn ", " wb "],
-        "Marathi": ["marathi", "मराठी", " mr ", " maharashtra"],
-        "Gujarati": ["gujarati", "ગુજરાતી", " gu "],
-        "Punjabi": ["punjabi", "ਪੰਜਾਬੀ", " pa "],
-        "Sanskrit": ["sanskrit", "संस्कृत", " sa "],
-    }
-
     # Count mentions of each language
     lang_scores = {}
-    for lang, keywords in language_keywords.items():
+    for lang, keywords in DESCRIPTION_LANGUAGE_KEYWORDS.items():
         score = sum(combined_text.count(kw) for kw in keywords)
         if score > 0:
             lang_scores[lang] = score
@@ -537,18 +2269,10 @@ def detect_language_from_description(description, channel):
     # Special handling for devotional/spiritual content
     # Check for spiritual keywords that might indicate South Indian languages
     if "spiritual" in combined_text or "devotional" in combined_text or "bhakti" in combined_text:
-        # Check title/description for deity names associated with regions
-        south_indian_deities = [
-            "venkateshwara", "venkateswara", "balaji", "tirupati",  # Tamil/Telugu
-            "murugan", "subrahmanya", "ayyappa", "meenakshi",  # Tamil
-            "vishnu", "shiva", "krishna", "rama"  # Pan-Indian but common in South
-        ]
-        for deity in south_indian_deities:
-            if deity in combined_text:
-                # If no other language detected and has South Indian deity
-                # Default to Tamil for devotional content (common in diaspora)
-                if not lang_scores:
-                    lang_scores["Tamil"] = 0.5
+        # If no other language detected and has South Indian deity,
+        # default to Tamil for devotional content (common in diaspora)
+        if not lang_scores and any(deity in combined_text for deity in SOUTH_INDIAN_DEITIES):
+            lang_scores["Tamil"] = 0.5
 
     # Return language with highest mentions
     if lang_scores:
@@ -577,17 +2301,32 @@ def get_metadata():
         return jsonify({"error": "Missing 'url' query parameter"}), 400
 
     try:
-        info = _extract_info_cached(url)
-    except yt_dlp.utils.DownloadError as e:
+        summary = _extract_metadata_info(url)
+    except Exception as e:
+        payload, status = _extraction_error(e)
+        return jsonify(payload), status
+
+    video_id = _extract_video_id(url)
+    if _caption_prefetcher is not None and video_id and summary.metadata.get("hasCaptions"):
+        # The frontend asks for this language next (or auto-picks when there is none)
+        _caption_prefetcher.submit(url, video_id, summary.metadata.get("captionLanguageCode"))
+    return jsonify(summary.metadata)
+
+
+def _extraction_error(e):
+    """Map an extraction failure to the (payload, status) the metadata routes return."""
+    if isinstance(e, yt_dlp.utils.DownloadError):
         error_msg = str(e)
         if "Private video" in error_msg:
-            return jsonify({"error": "This video is private"}), 403
+            return {"error": "This video is private"}, 403
         if "Video unavailable" in error_msg or "removed" in error_msg:
-            return jsonify({"error": "This video is unavailable or deleted"}), 404
-        return jsonify({"error": error_msg}), 400
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+            return {"error": "This video is unavailable or deleted"}, 404
+        return {"error": error_msg}, 400
+    return {"error": str(e)}, 500
+
 
+def _build_metadata(info):
+    """Assemble the /api/metadata payload from a yt-dlp info dict."""
     duration = info.get("duration")
     is_live = info.get("is_live", False)
     channel = info.get("channel") or info.get("uploader") or "YouTube Channel"
@@ -679,7 +2418,7 @@ def get_metadata():
             name = resolve_language(lang_code) or lang_code
             available_caption_languages[lang_code] = {"name": name, "type": "auto"}
 
-    return jsonify({
+    return {
         "duration": duration,
         "channelName": channel,
         "title": title,
@@ -692,7 +2431,7 @@ def get_metadata():
         "hasCaptions": has_captions,
         "availableCaptionLanguages": available_caption_languages,
         "isLive": bool(is_live),
-    })
+    }
 
 
 @app.route("/api/captions", methods=["GET"])
@@ -703,13 +2442,7 @@ def get_captions():
     Fallback: yt-dlp (if transcript API fails)
     """
     url = request.args.get("url")
-    lang = request.args.get("lang")
-    # Frontends sometimes accidentally send lang=None/null/undefined (as a string).
-    # Treat these as "no preference" so we auto-pick a valid caption track.
-    if lang is not None:
-        lang = lang.strip()
-        if lang == "" or lang.lower() in ("none", "null", "undefined", "auto"):
-            lang = None
+    lang = _normalize_caption_lang(request.args.get("lang"))
     if not url:
         return jsonify({"error": "Missing 'url' query parameter"}), 400
 
@@ -718,6 +2451,277 @@ def get_captions():
     if not video_id:
         return jsonify({"error": "Invalid YouTube URL"}), 400
 
+    entry = _get_captions_entry(url, video_id, lang)
+    if _caption_prefetcher is not None:
+        _caption_prefetcher.claim(video_id, lang)
+    return _caption_response(entry)
+
+
+def _normalize_caption_lang(lang):
+    # Frontends sometimes accidentally send lang=None/null/undefined (as a string).
+    # Treat these as "no preference" so we auto-pick a valid caption track.
+    if lang is not None:
+        lang = lang.strip()
+        if lang == "" or lang.lower() in ("none", "null", "undefined", "auto"):
+            lang = None
+    return lang
+
+
+def _caption_cache_key(video_id, lang):
+    return f"{video_id}:{(lang or 'auto').lower()}"
+
+
+def _get_captions_entry(url, video_id, lang, on_miss=None, on_fetched=None, record_stats=True):
+    """Return the captions entry for (video_id, lang), fetching and caching on a miss.
+
+    Concurrent misses for the same key share one upstream fetch, like extractions:
+    in-process through _single_flight, across workers through the cache lock table.
+    Only the caller that fetches runs its hooks: `on_miss` before fetching (e.g. to
+    wait for a rate limiter) and `on_fetched(entry)` before the entry is published.
+    """
+    cache_key = _caption_cache_key(video_id, lang)
+    entry = _caption_result_cache.get(cache_key, record_stats=record_stats)
+    if entry is None:
+        entry = _single_flight(
+            f"captions:{cache_key}",
+            lambda: _fetch_captions_across_workers(url, video_id, lang, cache_key, on_miss, on_fetched),
+        )
+    return entry
+
+
+def _fetch_captions_across_workers(url, video_id, lang, cache_key, on_miss, on_fetched):
+    """Fetch once across all workers: take the lock or wait for its holder's entry.
+
+    Transient failures are not cached, so waiters then take the lock and fetch themselves.
+    """
+    owner = uuid.uuid4().hex
+    while True:
+        entry = _caption_result_cache.get(cache_key, record_stats=False)
+        if entry is not None:
+            return entry
+        if _caption_result_cache.acquire_lock(cache_key, owner, _FLIGHT_LOCK_TTL):
+            break
+        time.sleep(_FLIGHT_POLL_INTERVAL)
+
+    try:
+        if on_miss is not None:
+            on_miss()
+        payload, status = _fetch_captions(url, video_id, lang)
+        if status not in (200, 404):
+            # Transient failures (rate limits, network errors) are not cached
+            return {"status": status, "payload": payload}
+        entry = _caption_cache_entry(payload, status)
+        if on_fetched is not None:
+            on_fetched(entry)
+        ttl = _CAPTION_CACHE_TTL if status == 200 else _CAPTION_NEGATIVE_TTL
+        _caption_result_cache.set(cache_key, entry, ttl=ttl)
+        return entry
+    finally:
+        _caption_result_cache.release_lock(cache_key, owner)
+
+
+# Speculative transcript prefetch (opt-in): after /api/metadata succeeds, the
+# transcript for the detected caption language is fetched in the background, so
+# the /api/captions call that usually follows is a cache hit. It runs on a few
+# low-priority threads; when those are busy, prefetches are dropped, not queued.
+_PREFETCH_CAPTIONS = os.environ.get("VOXTEXT_PREFETCH_CAPTIONS", "0") == "1"
+_PREFETCH_WORKERS = int(os.environ.get("VOXTEXT_PREFETCH_WORKERS", "2"))
+_PREFETCH_MAX_PENDING = int(os.environ.get("VOXTEXT_PREFETCH_MAX_PENDING", "16"))
+# A prefetched transcript that nobody asks for within this window is wasted
+_PREFETCH_WINDOW = int(os.environ.get("VOXTEXT_PREFETCH_WINDOW", "600"))
+
+
+def _lower_thread_priority():
+    """Renice the calling thread (Linux schedules threads individually)."""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (AttributeError, OSError):
+        pass
+
+
+class _CaptionPrefetcher:
+    """Background transcript fetches, with hit/waste accounting shared by all workers.
+
+    Each prefetched result leaves a marker in the shared SQLite file, written before
+    the result is published so a request waiting on the same fetch finds it. The
+    first /api/captions request for it claims the marker (a hit); markers that
+    expire unclaimed are counted as evictions of the namespace (wasted prefetches).
+    """
+
+    def __init__(self, workers, max_pending, window):
+        self.marks = _SQLiteCache(_CACHE_DB_PATH, "prefetch", window)
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="voxtext-prefetch", initializer=_lower_thread_priority
+        )
+        self._lock = threading.Lock()
+        self._pending = set()  # Cache keys queued or running in this worker
+        self._counts = Counter()
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def submit(self, url, video_id, lang):
+        cache_key = _caption_cache_key(video_id, lang)
+        with self._lock:
+            if cache_key in self._pending:
+                return
+            if len(self._pending) >= self.max_pending:
+                self._counts["dropped"] += 1
+                return
+            self._pending.add(cache_key)
+            self._counts["queued"] += 1
+        self._executor.submit(self._run, url, video_id, lang, cache_key)
+
+    def _run(self, url, video_id, lang, cache_key):
+        fetched = []
+        try:
+            entry = _get_captions_entry(
+                url, video_id, lang, on_miss=lambda: fetched.append(True),
+                on_fetched=lambda entry: self.marks.set(cache_key, entry["storedAt"]), record_stats=False,
+            )
+            if not fetched:
+                self._count("alreadyCached")
+            elif entry["status"] in (200, 404):
+                self._count("fetched")
+            else:
+                self._count("failed")
+        except Exception as e:
+            print(f"[prefetch] {cache_key}: {e}")
+            self._count("failed")
+        finally:
+            with self._lock:
+                self._pending.discard(cache_key)
+
+    def claim(self, video_id, lang):
+        """Record a captions request: a hit if it is the first one for a prefetched result."""
+        cache_key = _caption_cache_key(video_id, lang)
+        if self.marks.get(cache_key) is not None:
+            self.marks.delete(cache_key)
+
+    def stats(self):
+        # Settle markers that expired unclaimed since the last sweep, so they count as waste now
+        self.marks.sweep()
+        marks = self.marks.stats()
+        hits, wasted = marks["hits"], marks["evictions"]
+        settled = hits + wasted
+        with self._lock:
+            counts = {name: self._counts[name] for name in ("queued", "dropped", "alreadyCached", "fetched", "failed")}
+            pending = len(self._pending)
+        return {
+            "enabled": True,
+            # This worker's queue
+            **counts,
+            "pending": pending,
+            # Shared by all workers
+            "hits": hits,
+            "wasted": wasted,
+            "unclaimed": marks["entries"],
+            "hitRatio": round(hits / settled, 4) if settled else None,
+            "wasteRatio": round(wasted / settled, 4) if settled else None,
+            # Share of /api/captions requests answered by a prefetch
+            "coverage": marks["hitRatio"],
+        }
+
+
+_caption_prefetcher = (
+    _CaptionPrefetcher(_PREFETCH_WORKERS, _PREFETCH_MAX_PENDING, _PREFETCH_WINDOW) if _PREFETCH_CAPTIONS else None
+)
+
+
+def _caption_cache_entry(payload, status):
+    """Wrap a captions payload with the validators served to clients.
+
+    Segments are stored in columnar form, which is also smaller once compressed.
+    """
+    if "segments" in payload:
+        payload = {**payload, "segments": SegmentStore.from_segments(payload["segments"]).to_columns()}
+    body = json_lib.dumps(payload, separators=(",", ":"), sort_keys=True)
+    return {
+        "status": status,
+        "payload": payload,
+        "etag": hashlib.sha1(body.encode("utf-8")).hexdigest(),
+        "storedAt": int(time.time()),
+    }
+
+
+def _caption_payload_rows(payload):
+    """Return a captions payload with segments as the default list of row dicts."""
+    if "segments" not in payload:
+        return payload
+    return {**payload, "segments": SegmentStore.from_segments(payload["segments"]).to_rows()}
+
+
+# Caption representations selectable with the Accept header, with their ETag suffix.
+# JSON rows are the default; the columnar and binary forms avoid repeating keys
+# for every segment.
+_CAPTION_JSON = "application/json"
+_CAPTION_COLUMNAR = "application/vnd.voxtext.columnar+json"
+_CAPTION_BINARY = "application/vnd.voxtext.segments"
+_CAPTION_MSGPACK = "application/msgpack"
+_CAPTION_REPRESENTATIONS = {_CAPTION_JSON: "", _CAPTION_COLUMNAR: "-columnar", _CAPTION_BINARY: "-binary"}
+if msgpack is not None:
+    _CAPTION_REPRESENTATIONS[_CAPTION_MSGPACK] = "-msgpack"
+
+
+def _caption_body(payload, mimetype):
+    """Serialize a captions payload (segments in columnar form) as a compact `mimetype`."""
+    if mimetype == _CAPTION_MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True)
+    if mimetype == _CAPTION_BINARY:
+        # b"VXS1", u32 header length, JSON header (payload without segments), segments
+        header = json_lib.dumps(
+            {k: v for k, v in payload.items() if k != "segments"}, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        segments = SegmentStore.from_segments(payload["segments"])
+        return b"".join((b"VXS1", struct.pack("<I", len(header)), header, segments.to_binary()))
+    payload = {**payload, "segments": SegmentStore.from_segments(payload["segments"]).to_columns()}
+    return json_lib.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def _caption_response(entry):
+    """Serve a cached captions entry, answering 304 when the client copy is current."""
+    mimetype = _CAPTION_JSON
+    if entry["status"] == 200 and "etag" in entry:
+        mimetype = request.accept_mimetypes.best_match(list(_CAPTION_REPRESENTATIONS), default=_CAPTION_JSON)
+    if "etag" not in entry:
+        response = jsonify(entry["payload"])
+        response.status_code = entry["status"]
+        return response
+
+    # Each representation gets its own validator
+    etag = entry["etag"] + _CAPTION_REPRESENTATIONS[mimetype]
+    encoding = _accepted_encoding() if entry["status"] == 200 else None
+    if not is_resource_modified(request.environ, etag=etag, last_modified=http_date(entry["storedAt"])):
+        response = Response(status=304)
+    else:
+        body = _caption_body_cache.get(f"{etag}:{encoding}") if encoding else None
+        if body is not None:
+            response = Response(body, mimetype=mimetype)
+            response.headers["Content-Encoding"] = encoding
+        else:
+            if mimetype == _CAPTION_JSON:
+                response = jsonify(_caption_payload_rows(entry["payload"]))
+                response.status_code = entry["status"]
+            else:
+                response = Response(_caption_body(entry["payload"], mimetype), mimetype=mimetype)
+            if encoding and len(response.get_data()) >= _COMPRESS_MIN_BYTES:
+                body = _compress_body(response.get_data(), encoding)
+                _caption_body_cache.set(f"{etag}:{encoding}", body)
+                response.set_data(body)
+                response.headers["Content-Encoding"] = encoding
+    if entry["status"] == 200:
+        response.vary.update(("Accept", "Accept-Encoding"))
+    # Encoded bodies get a weak validator, which still matches on revalidation
+    response.set_etag(etag, weak="Content-Encoding" in response.headers)
+    response.last_modified = entry["storedAt"]
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _fetch_captions(url, video_id, lang):
+    """Fetch captions upstream. Returns (payload, status) for the route to serve or cache."""
     # === PRIMARY METHOD: youtube-transcript-api ===
     # This works reliably on VPS/cloud IPs without bot detection
     try:
@@ -734,7 +2738,7 @@ def get_captions():
 
         if transcript_data:
             # Success! Return the transcript
-            return jsonify(transcript_data)
+            return transcript_data, 200
 
     except Exception as e:
         # Log but don't fail - we'll try yt-dlp fallback
@@ -744,111 +2748,136 @@ def get_captions():
     # Only used if youtube-transcript-api fails (rare)
     # This may fail on VPS due to bot detection, but kept for compatibility
     try:
-        info = _extract_info_cached(url)
+        summary = _extract_info_cached(url)
     except yt_dlp.utils.DownloadError as e:
         error_msg = str(e)
         if "Private video" in error_msg:
-            return jsonify({"error": "This video is private"}), 403
+            return {"error": "This video is private"}, 403
         if "Video unavailable" in error_msg or "removed" in error_msg:
-            return jsonify({"error": "This video is unavailable or deleted"}), 404
+            return {"error": "This video is unavailable or deleted"}, 404
         if "Sign in to confirm" in error_msg or "bot" in error_msg.lower():
-            return jsonify({"error": "Video temporarily unavailable due to rate limiting. Please try again."}), 429
-        return jsonify({"error": error_msg}), 400
+            return {"error": "Video temporarily unavailable due to rate limiting. Please try again."}, 429
+        return {"error": error_msg}, 400
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-    manual_subs = info.get("subtitles") or {}
-    auto_caps = info.get("automatic_captions") or {}
+        return {"error": str(e)}, 500
 
-    # Filter out live_chat (it's not a real caption)
-    manual_subs = {k: v for k, v in manual_subs.items() if k != "live_chat"}
-
-    if not manual_subs and not auto_caps:
-        return jsonify({"error": "No captions available for this video"}), 404
-
-    # Determine target language
-    target_lang = lang
-    if not target_lang:
-        # Auto-pick: prefer manual, then original ASR
-        for lc in manual_subs:
-            if manual_subs[lc]:
-                target_lang = lc
-                break
-        if not target_lang:
-            for lc, tracks in auto_caps.items():
-                if tracks:
-                    target_lang = lc
-                    break
+    # Tracks by lowercase code, manual before auto, so the first one is the auto-pick
+    caption_tracks = summary.caption_tracks
+    if not caption_tracks:
+        return {"error": "No captions available for this video"}, 404
 
-    # Find matching language (case-insensitive)
-    manual_lower = {k.lower(): k for k in manual_subs}
-    auto_lower = {k.lower(): k for k in auto_caps}
-    tl = target_lang.lower() if target_lang else ""
-
-    resolved_lang = None
-    tracks = None
-    caption_type = "manual"
-
-    if tl in manual_lower:
-        resolved_lang = manual_lower[tl]
-        tracks = manual_subs[resolved_lang]
-    elif tl in auto_lower:
-        resolved_lang = auto_lower[tl]
-        tracks = auto_caps[resolved_lang]
-        caption_type = "auto"
-    else:
+    tl = (lang or next(iter(caption_tracks))).lower()
+    track = caption_tracks.get(tl)
+    if track is None:
         # Base language fallback
         base = tl.split("-")[0]
-        for lc in manual_subs:
-            if lc.lower().split("-")[0] == base:
-                resolved_lang = lc
-                tracks = manual_subs[lc]
-                break
-        if not tracks:
-            for lc in auto_caps:
-                if lc.lower().split("-")[0] == base:
-                    resolved_lang = lc
-                    tracks = auto_caps[lc]
-                    caption_type = "auto"
-                    break
-
-    if not tracks:
-        return jsonify({"error": f"No captions available for language: {lang}"}), 404
-
-    # Get caption URL
-    caption_url = None
-    for track in tracks:
-        if track.get("ext") == "json3":
-            caption_url = track.get("url")
-            break
-    if not caption_url and tracks:
-        caption_url = tracks[0].get("url")
+        track = next((t for code, t in caption_tracks.items() if code.split("-")[0] == base), None)
+    if track is None:
+        return {"error": f"No captions available for language: {lang}"}, 404
 
+    resolved_lang = track["code"]
+    caption_type = track["type"]
+    caption_url = track["url"]
     if not caption_url:
-        return jsonify({"error": "Could not find caption download URL"}), 404
+        return {"error": "Could not find caption download URL"}, 404
 
     # Fetch and parse captions
     try:
-        raw = _fetch_url_with_cookies(caption_url)
-        if not raw:
-            raw = _fetch_url_via_ytdlp(caption_url)
-
-        segments = _parse_caption_content(raw)
+        # Segments are parsed as the body streams in
+        with contextlib.closing(_iter_caption_body(caption_url)) as chunks:
+            segments = SegmentStore.from_segments(iter_caption_segments(chunks))
         if not segments:
-            return jsonify({"error": "Failed to parse captions"}), 500
+            return {"error": "Failed to parse captions"}, 500
 
         lang_name = resolve_language(resolved_lang) or resolved_lang
-        return jsonify({
+        return {
             "language": resolved_lang,
             "languageName": lang_name,
             "segments": segments,
             "type": caption_type,
-        })
+        }, 200
 
     except Exception as e:
-        return jsonify({"error": f"Failed to fetch captions: {str(e)}"}), 500
+        return {"error": f"Failed to fetch captions: {str(e)}"}, 500
 
 
+@app.route("/api/translate", methods=["GET", "POST"])
+def translate_captions():
+    """
+    Translate caption segments into `target`.
+    Either pass `url` (and optionally `lang`) to translate a video's captions, or
+    POST a JSON body with `segments` and an optional `source` language.
+    """
+    params = (request.get_json(silent=True) or {}) if request.method == "POST" else request.args
+    if not isinstance(params, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    invalid = [name for name in ("target", "url", "lang", "source")
+               if params.get(name) is not None and not isinstance(params.get(name), str)]
+    if invalid:
+        return jsonify({"error": f"'{invalid[0]}' must be a string"}), 400
+    target = (params.get("target") or "").strip()
+    if not target:
+        return jsonify({"error": "Missing 'target' parameter"}), 400
+
+    url = params.get("url")
+    if url:
+        video_id = _extract_video_id(url)
+        if not video_id:
+            return jsonify({"error": "Invalid YouTube URL"}), 400
+        entry = _get_captions_entry(url, video_id, _normalize_caption_lang(params.get("lang")))
+        if entry["status"] != 200:
+            return jsonify(entry["payload"]), entry["status"]
+        segments = SegmentStore.from_segments(entry["payload"]["segments"]).to_rows()
+        source = entry["payload"]["language"]
+    else:
+        segments = params.get("segments")
+        source = (params.get("source") or "auto").strip()
+        if not isinstance(segments, list) or not all(
+            isinstance(seg, dict) and isinstance(seg.get("text"), str) for seg in segments
+        ):
+            return jsonify({"error": "Provide 'url' or a 'segments' list of {startMs, endMs, text}"}), 400
+        segments = [
+            {"startMs": seg.get("startMs", 0), "endMs": seg.get("endMs", 0), "text": seg["text"]}
+            for seg in segments
+        ]
+    if len(segments) > _TRANSLATE_MAX_SEGMENTS:
+        return jsonify({"error": f"Too many segments (max {_TRANSLATE_MAX_SEGMENTS})"}), 413
+
+    if source == target:
+        translated, memory = segments, None
+    else:
+        translated, memory = _translate_segments(segments, source, target)
+    return jsonify({
+        "language": target,
+        "languageName": resolve_language(target) or target,
+        "sourceLanguage": source,
+        "segments": translated,
+        "type": "translated",
+        "translationMemory": memory,
+    })
+
+
+# Extra heights a /api/formats request may ask about (`heights=1080,144`)
+_FORMAT_HEIGHTS_MAX = 8
+_FORMAT_HEIGHT_LIMIT = 4320
+
+
+def _parse_format_heights(raw):
+    """Parse a comma-separated `heights` list ("1080,144p"). Returns (heights, error)."""
+    heights = []
+    for part in (raw or "").split(","):
+        part = part.strip().lower().removesuffix("p")
+        if not part:
+            continue
+        if not part.isdigit() or not 0 < int(part) <= _FORMAT_HEIGHT_LIMIT:
+            return None, f"Invalid height: {part}"
+        height = int(part)
+        # The quality labels are always included
+        if height not in heights and height not in _QUALITY_HEIGHT.values():
+            heights.append(height)
+    if len(heights) > _FORMAT_HEIGHTS_MAX:
+        return None, f"At most {_FORMAT_HEIGHTS_MAX} extra heights per request"
+    return sorted(heights, reverse=True), None
 
 
 @app.route("/api/formats", methods=["GET"])
@@ -857,223 +2886,1459 @@ def get_formats():
     url = request.args.get("url")
     if not url:
         return jsonify({"error": "Missing 'url' query parameter"}), 400
+    heights, error = _parse_format_heights(request.args.get("heights"))
+    if error:
+        return jsonify({"error": error}), 400
+    audio_format = (request.args.get("audio_format") or "native").lower()
+    if audio_format not in _AUDIO_FORMATS:
+        return jsonify({"error": f"Invalid audio_format: {audio_format}"}), 400
 
     try:
-        info = _extract_info_cached(url)
+        summary = _extract_info_cached(url)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+    return jsonify(_build_formats(summary, heights, audio_format))
+
+
+# Rough video bitrates (kbps) by height, for size estimates when there is no duration
+_TYPICAL_VIDEO_KBPS = {720: 2500, 480: 1000, 360: 750, 240: 400}
+
+
+def _format_index(info):
+    """Index the formats in one pass: video formats sorted by height, audio per variant.
+
+    Returns {"heights", "video", "audio"}: the sorted heights (the bisect keys),
+    [formatId, height, sizeBytes] per video format in the same order (ties keep
+    yt-dlp's order), and {formatId, abr, sizeBytes} or None per Audio Only variant
+    (m4a, opus, and mp3 transcoded from whichever audio-only format is best). A
+    video size is None when neither a file size nor bitrate and duration are known.
+    """
     duration = info.get("duration") or 0
-    formats_list = info.get("formats") or []
+    video = []
+    best_audio = dict.fromkeys(("any",) + _NATIVE_AUDIO_FORMATS)
+    for f in info.get("formats") or []:
+        height = f.get("height")
+        vcodec = f.get("vcodec")
+        acodec = f.get("acodec")
+        if height and vcodec and vcodec != "none":
+            size_bytes = f.get("filesize") or f.get("filesize_approx")
+            if not size_bytes and f.get("tbr") and duration > 0:
+                size_bytes = int(f["tbr"] * 1000 / 8 * duration * 1.1)
+            video.append([f.get("format_id"), height, size_bytes or None])
+        elif acodec and acodec != "none":
+            # Audio-only: has an audio codec, no video codec or height. Prefer higher quality audio
+            # within each variant, matched the same way as _native_audio_variants
+            for variant, matches in (("any", True), ("m4a", f.get("ext") == "m4a"),
+                                     ("opus", acodec.startswith("opus"))):
+                best = best_audio[variant]
+                if matches and (not best or (f.get("abr") or 0) > (best.get("abr") or 0)):
+                    best_audio[variant] = f
+    video.sort(key=lambda entry: entry[1])
+
+    audio = {variant: _audio_entry(best_audio[variant], duration) for variant in _NATIVE_AUDIO_FORMATS}
+    # mp3 is transcoded at the plan's 192 kbps, so its size follows from the duration alone
+    audio["mp3"] = _audio_entry(best_audio["any"], duration, abr=192) if best_audio["any"] else None
+    return {"heights": [entry[1] for entry in video], "video": video, "audio": audio}
+
+
+def _audio_entry(f, duration, abr=None):
+    """{formatId, abr, sizeBytes} for an audio-only format, or None; `abr` overrides a transcoded bitrate."""
+    if not f:
+        return None
+    size_bytes = None if abr else f.get("filesize") or f.get("filesize_approx")
+    abr = abr or f.get("abr")
+    # Estimate size if not provided
+    if not size_bytes and abr and duration > 0:
+        size_bytes = int(abr * 1000 / 8 * duration)
+    # If still no size and no duration, estimate for 5 minutes
+    elif not size_bytes and not duration:
+        size_bytes = int((abr or 128) * 1000 / 8 * 300)
+    return {"formatId": f.get("format_id"), "abr": abr, "sizeBytes": size_bytes}
 
-    # Check if video was live or is a premiere (might not have standard formats)
-    was_live = info.get("was_live", False)
-    is_live = info.get("is_live", False)
 
-    QUALITY_MAP = {
-        "720p HD": 720,
-        "480p": 480,
-        "360p": 360,
-        "240p": 240,
-    }
-    DURATION_LIMITS = {
-        "720p HD": 2700,    # 45 min
-        "480p": 3600,       # 1 hour
-        "360p": 7200,       # 2 hours
-        "240p": 7200,       # 2 hours
-        "Audio Only": 3600, # 1 hour
-    }
+def _best_video_format(index, height, duration):
+    """Best indexed video format at or below `height`: {formatId, height, sizeBytes} or None.
 
-    result = {}
-    for quality_label, target_height in QUALITY_MAP.items():
-        best = None
-        for f in formats_list:
-            h = f.get("height")
-            vcodec = f.get("vcodec")
-
-            # Skip audio-only formats and formats without video codec
-            if not h or not vcodec or vcodec == "none":
-                continue
+    That is the tallest one, and the first yt-dlp listed among equally tall ones.
+    """
+    heights = index["heights"]
+    i = bisect.bisect_right(heights, height)
+    if not i:
+        return None
+    format_id, best_height, size_bytes = index["video"][bisect.bisect_left(heights, heights[i - 1])]
+    if size_bytes is None and not duration:
+        # No duration (livestreams/premieres): assume 5 minutes at a typical bitrate
+        size_bytes = int(_TYPICAL_VIDEO_KBPS.get(height, 1000) * 1000 / 8 * 300)
+    return {"formatId": format_id, "height": best_height, "sizeBytes": size_bytes}
+
+
+def _height_duration_limit(height):
+    """Duration limit for an arbitrary height: that of the nearest quality label at or above it."""
+    at_or_above = [label for label, h in _QUALITY_HEIGHT.items() if h >= height]
+    if at_or_above:
+        label = min(at_or_above, key=_QUALITY_HEIGHT.get)
+    else:
+        label = max(_QUALITY_HEIGHT, key=_QUALITY_HEIGHT.get)
+    return _DOWNLOAD_DURATION_LIMITS[label]
 
-            # Find exact match or closest match below target
-            if h == target_height:
-                best = f
-                break
-            elif h <= target_height and (not best or h > best.get("height", 0)):
-                best = f
 
-        if best:
-            size_bytes = best.get("filesize") or best.get("filesize_approx")
-            # Estimate size if not provided and we have bitrate and duration
-            if not size_bytes and best.get("tbr") and duration > 0:
-                size_bytes = int(best["tbr"] * 1000 / 8 * duration * 1.1)
-            # If still no size and no duration, use a default estimate
-            elif not size_bytes and not duration:
-                # Estimate based on typical bitrates (very rough)
-                typical_bitrate = {720: 2500, 480: 1000, 360: 750, 240: 400}.get(target_height, 1000)
-                # Assume 5 minutes if no duration (for livestreams/premieres)
-                size_bytes = int(typical_bitrate * 1000 / 8 * 300)
-
-            size_mb = round((size_bytes or 0) / (1024 * 1024), 1)
-            over_limit = duration > DURATION_LIMITS[quality_label] if duration > 0 else False
+def _build_formats(summary, heights=(), audio_format="native"):
+    """Assemble the /api/formats payload from a VideoSummary.
+
+    `heights` adds "<N>p" entries for heights beyond the four quality labels.
+    Audio Only is sized from the variant a download with `audio_format` would serve.
+    """
+    duration = summary.duration or 0
+    index = summary.format_index
+    audio_variant = _resolve_audio_format(summary, audio_format)
+    qualities = [(label, _best_video_format(index, height, duration), _DOWNLOAD_DURATION_LIMITS[label])
+                 for label, height in _QUALITY_HEIGHT.items()]
+    qualities += [(f"{height}p", _best_video_format(index, height, duration), _height_duration_limit(height))
+                  for height in heights]
+    qualities.append(("Audio Only", index["audio"][audio_variant], _DOWNLOAD_DURATION_LIMITS["Audio Only"]))
 
+    result = {}
+    for quality_label, best, max_seconds in qualities:
+        if best:
             result[quality_label] = {
-                "sizeMB": size_mb,
+                "sizeMB": round((best["sizeBytes"] or 0) / (1024 * 1024), 1),
                 "available": True,
-                "overLimit": over_limit,
-                "maxMinutes": DURATION_LIMITS[quality_label] // 60,
+                "overLimit": duration > max_seconds if duration > 0 else False,
+                "maxMinutes": max_seconds // 60,
             }
         else:
-            result[quality_label] = {"sizeMB": 0, "available": False, "overLimit": False, "maxMinutes": DURATION_LIMITS[quality_label] // 60}
+            result[quality_label] = {"sizeMB": 0, "available": False, "overLimit": False, "maxMinutes": max_seconds // 60}
+    if result["Audio Only"]["available"]:
+        result["Audio Only"]["format"] = audio_variant
+    return {"formats": result, "duration": duration}
 
-    # Audio Only
-    best_audio = None
-    for f in formats_list:
-        acodec = f.get("acodec")
-        vcodec = f.get("vcodec")
 
-        # Audio-only format: has audio codec, no video codec or height
-        if acodec and acodec != "none" and (not vcodec or vcodec == "none" or not f.get("height")):
-            # Prefer higher quality audio
-            if not best_audio or (f.get("abr") or 0) > (best_audio.get("abr") or 0):
-                best_audio = f
-
-    if best_audio:
-        size_bytes = best_audio.get("filesize") or best_audio.get("filesize_approx")
-        # Estimate size if not provided
-        if not size_bytes and best_audio.get("abr") and duration > 0:
-            size_bytes = int(best_audio["abr"] * 1000 / 8 * duration)
-        # If still no size and no duration, estimate for 5 minutes
-        elif not size_bytes and not duration:
-            typical_audio_bitrate = best_audio.get("abr") or 128
-            size_bytes = int(typical_audio_bitrate * 1000 / 8 * 300)
-
-        size_mb = round((size_bytes or 0) / (1024 * 1024), 1)
-        over_limit = duration > DURATION_LIMITS["Audio Only"] if duration > 0 else False
-        result["Audio Only"] = {"sizeMB": size_mb, "available": True, "overLimit": over_limit, "maxMinutes": 60}
-    else:
-        result["Audio Only"] = {"sizeMB": 0, "available": False, "overLimit": False, "maxMinutes": 60}
+def _caption_track_index(info):
+    """Caption tracks by lowercase language code, manual before auto, without live_chat.
+
+    Each entry holds the original code, the type and the json3 (else first) track URL.
+    """
+    index = {}
+    for caption_type, subs in (("manual", info.get("subtitles")), ("auto", info.get("automatic_captions"))):
+        for code, tracks in (subs or {}).items():
+            if code == "live_chat" or not tracks or code.lower() in index:
+                continue
+            url = next((t.get("url") for t in tracks if t.get("ext") == "json3"), None) or tracks[0].get("url")
+            index[code.lower()] = {"code": code, "type": caption_type, "url": url}
+    return index
+
+
+# Fields of a chosen format that a streaming download needs (see _build_stream_command)
+_STREAM_FORMAT_FIELDS = ("format_id", "url", "http_headers", "ext", "height")
+
 
-    return jsonify({"formats": result, "duration": duration})
+class VideoSummary:
+    """What the routes need from one extraction, computed once when it is cached.
+
+    Cached in place of the raw info dict (a few KB instead of hundreds): the
+    /api/metadata payload with its language detection, caption tracks by lowercase
+    code, the format index (video formats by height with size estimates and the
+    best audio format per Audio Only variant), the native audio variants and the direct-URL formats a streaming download pipes.
+    Lite extractions carry no formats (`has_formats` is False).
+    """
+
+    __slots__ = ("id", "title", "duration", "metadata", "caption_tracks", "has_formats",
+                 "format_index", "audio_variants", "audio_sources", "stream_formats")
+
+    @classmethod
+    def from_info(cls, info, with_formats=True):
+        summary = cls()
+        summary.id = info.get("id") or ""
+        summary.title = info.get("title")
+        summary.duration = info.get("duration")
+        summary.metadata = _build_metadata(info)
+        summary.caption_tracks = _caption_track_index(info)
+        summary.has_formats = with_formats
+        if not with_formats:
+            info = {"duration": info.get("duration")}
+        summary.format_index = _format_index(info)
+        summary.audio_variants = _native_audio_variants(info)
+        summary.audio_sources = {
+            variant: {field: f.get(field) for field in _STREAM_FORMAT_FIELDS} if f else None
+            for variant, f in _select_audio_sources(info).items()
+        }
+        summary.stream_formats = {}
+        for quality_label in _DOWNLOAD_DURATION_LIMITS:
+            summary.stream_formats[quality_label] = [
+                {field: f.get(field) for field in _STREAM_FORMAT_FIELDS} if f else None
+                for f in _select_stream_formats(info, _QUALITY_HEIGHT.get(quality_label))
+            ]
+        return summary
+
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls()
+        for field in cls.__slots__:
+            setattr(summary, field, data[field])
+        return summary
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+# Captions run on this pool while the bundle route summarizes metadata and formats
+_BUNDLE_PARTS = ("metadata", "formats", "captions")
+_bundle_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="voxtext-bundle")
 
 
-def _delayed_cleanup(path, delay=5):
-    """Delete a temp file/directory after a delay."""
-    def cleanup():
-        import time as _time
-        _time.sleep(delay)
+@app.route("/api/video", methods=["GET"])
+def get_video_bundle():
+    """
+    Return metadata, formats and captions for one video in a single round trip.
+    `include` selects a comma-separated subset (default: all three); `lang` is
+    passed to the captions part. Every part shares one cached extraction.
+    """
+    url = request.args.get("url")
+    if not url:
+        return jsonify({"error": "Missing 'url' query parameter"}), 400
+    include = request.args.get("include")
+    parts = [p.strip() for p in include.split(",") if p.strip()] if include else list(_BUNDLE_PARTS)
+    unknown = [p for p in parts if p not in _BUNDLE_PARTS]
+    if unknown or not parts:
+        return jsonify({"error": f"Invalid include: {', '.join(unknown) or include}"}), 400
+
+    captions_future = None
+    if "captions" in parts:
+        video_id = _extract_video_id(url)
+        if not video_id:
+            return jsonify({"error": "Invalid YouTube URL"}), 400
+        lang = _normalize_caption_lang(request.args.get("lang"))
+        captions_future = _bundle_executor.submit(_get_captions_entry, url, video_id, lang)
+
+    result = {}
+    if "metadata" in parts or "formats" in parts:
         try:
-            if os.path.isdir(path):
-                shutil.rmtree(path, ignore_errors=True)
-            elif os.path.exists(path):
+            summary = _extract_info_cached(url) if "formats" in parts else _extract_metadata_info(url)
+        except Exception as e:
+            if captions_future:
+                captions_future.cancel()
+            payload, status = _extraction_error(e)
+            return jsonify(payload), status
+        if "metadata" in parts:
+            result["metadata"] = summary.metadata
+        if "formats" in parts:
+            result["formats"] = _build_formats(summary)
+
+    if captions_future:
+        result["captions"] = _bundle_captions(captions_future.result())
+    return jsonify(result)
+
+
+def _bundle_captions(entry):
+    """The captions part of a bundle: payload rows, or the error body plus its status."""
+    if entry["status"] == 200:
+        return _caption_payload_rows(entry["payload"])
+    # A missing transcript should not fail the metadata/formats parts
+    return {**entry["payload"], "status": entry["status"]}
+
+
+# /api/batch: many videos per request, streamed back as NDJSON. Playlists are listed
+# with flat extraction; videos then run through a bounded pool shared by all batch
+# requests, each request keeping at most _BATCH_CONCURRENCY videos in flight so
+# concurrent batches interleave. Upstream YouTube work (cache misses only) is paced
+# by a token bucket, since hundreds of back-to-back extractions are what get 429s.
+_BATCH_MAX_VIDEOS = int(os.environ.get("VOXTEXT_BATCH_MAX_VIDEOS", "500"))
+_BATCH_CONCURRENCY = int(os.environ.get("VOXTEXT_BATCH_CONCURRENCY", "4"))
+_BATCH_RATE = float(os.environ.get("VOXTEXT_BATCH_RATE", "2"))  # YouTube fetches per second
+_BATCH_DEFAULT_PARTS = ("metadata", "captions")
+# A sync WSGI worker is killed once a request outlives gunicorn's --timeout (120 s in
+# the Dockerfile), so there a batch stops starting videos after this many seconds and
+# lists the rest in its done line for a follow-up request. 0 disables the budget;
+# ASGI mode streams from its own thread pool and is never capped.
+_BATCH_TIME_BUDGET = float(os.environ.get("VOXTEXT_BATCH_TIME_BUDGET", "90"))
+_PLAYLIST_CACHE_TTL = 600  # 10 minutes
+_VIDEO_ID_RE = re.compile(r'[A-Za-z0-9_-]{11}')
+_playlist_cache = _make_cache("playlist", _PLAYLIST_CACHE_TTL)
+_batch_executor = ThreadPoolExecutor(max_workers=_BATCH_CONCURRENCY, thread_name_prefix="voxtext-batch")
+_batch_limiter = _RateLimiter(_BATCH_RATE, burst=_BATCH_CONCURRENCY)
+
+
+def _list_playlist(url, limit):
+    """Flat-extract a playlist, channel tab or video URL to {id, title, videoIds}."""
+    with _ytdl_playlist_pool.checkout() as ydl:
+        info = ydl.extract_info(url, download=False, process=False)
+        # Watch URLs with `list=` (and channel roots) first resolve to another URL
+        for _ in range(3):
+            if info.get("_type") not in ("url", "url_transparent"):
+                break
+            info = ydl.extract_info(info["url"], download=False, process=False, ie_key=info.get("ie_key"))
+        if info.get("_type", "video") == "video":
+            return {"id": info.get("id"), "title": info.get("title"), "videoIds": [info["id"]]}
+        # Entries are a lazy generator; stop paging once `limit` videos are listed
+        video_ids = []
+        for entry in info.get("entries") or ():
+            video_id = (entry or {}).get("id") or ""
+            if _VIDEO_ID_RE.fullmatch(video_id) and entry.get("ie_key", "Youtube") == "Youtube":
+                video_ids.append(video_id)
+                if len(video_ids) >= limit:
+                    break
+    return {"id": info.get("id"), "title": info.get("title"), "videoIds": list(dict.fromkeys(video_ids))}
+
+
+def _list_playlist_cached(url, limit):
+    cache_key = f"{url}:{limit}"
+    listing = _playlist_cache.get(cache_key)
+    if listing is None:
+        listing = _single_flight(f"playlist:{cache_key}", lambda: _list_playlist(url, limit))
+        _playlist_cache.set(cache_key, listing)
+    return listing
+
+
+def _batch_item(video_id, parts, lang):
+    """One NDJSON result line for a video; failures are reported in the line, not raised."""
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    item = {"type": "video", "id": video_id}
+    try:
+        if "metadata" in parts or "formats" in parts:
+            if "formats" in parts:
+                summary = _extract_info_cached(url, on_miss=_batch_limiter.acquire)
+            else:
+                summary = _extract_metadata_info(url, on_miss=_batch_limiter.acquire)
+            if "metadata" in parts:
+                item["metadata"] = summary.metadata
+            if "formats" in parts:
+                item["formats"] = _build_formats(summary)
+        if "captions" in parts:
+            item["captions"] = _bundle_captions(
+                _get_captions_entry(url, video_id, lang, on_miss=_batch_limiter.acquire)
+            )
+    except Exception as e:
+        payload, status = _extraction_error(e)
+        return {"type": "video", "id": video_id, **payload, "status": status}
+    return item
+
+
+def _ndjson_line(value):
+    return json_lib.dumps(value, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _stream_batch(header, video_ids, parts, lang, budget=None):
+    """NDJSON lines for a batch; after `budget` seconds no further videos are started."""
+    started = time.time()
+    yield _ndjson_line(header)
+    next_index = 0
+    pending = {}
+    errors = 0
+    try:
+        while True:
+            if not budget or time.time() - started < budget:
+                while next_index < len(video_ids) and len(pending) < _BATCH_CONCURRENCY:
+                    future = _batch_executor.submit(_batch_item, video_ids[next_index], parts, lang)
+                    pending[future] = next_index
+                    next_index += 1
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = future.result()
+                item["index"] = pending.pop(future)
+                errors += "error" in item
+                yield _ndjson_line(item)
+    finally:
+        # Client went away: drop the videos that have not started yet
+        for future in pending:
+            future.cancel()
+    done = {
+        "type": "done",
+        "count": len(video_ids),
+        "errors": errors,
+        "elapsedMs": int((time.time() - started) * 1000),
+    }
+    if next_index < len(video_ids):
+        # Out of time: the client posts these as `ids` to continue
+        done["remaining"] = video_ids[next_index:]
+    yield _ndjson_line(done)
+
+
+@app.route("/api/batch", methods=["POST"])
+def batch_videos():
+    """
+    Metadata, formats and/or captions for many videos, streamed as NDJSON.
+    POST JSON with either `url` (playlist, channel tab or video) or `ids` (video IDs
+    or URLs), plus optional `include`, `lang` and `limit`. One line is written per
+    video as soon as it finishes, so lines arrive out of order; each has `index`.
+    """
+    params = request.get_json(silent=True) or {}
+    if not isinstance(params, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    include = params.get("include")
+    if isinstance(include, str):
+        include = [p.strip() for p in include.split(",") if p.strip()]
+    elif include is not None and (not isinstance(include, list) or not all(isinstance(p, str) for p in include)):
+        return jsonify({"error": f"Invalid include: {json_lib.dumps(include)}"}), 400
+    parts = set(include or _BATCH_DEFAULT_PARTS)
+    unknown = sorted(p for p in parts if p not in _BUNDLE_PARTS)
+    if unknown or not parts:
+        return jsonify({"error": f"Invalid include: {', '.join(unknown) or include}"}), 400
+    lang = params.get("lang")
+    if lang is not None and not isinstance(lang, str):
+        return jsonify({"error": "'lang' must be a string"}), 400
+    lang = _normalize_caption_lang(lang)
+    try:
+        limit = min(int(params.get("limit", _BATCH_MAX_VIDEOS)), _BATCH_MAX_VIDEOS)
+    except (TypeError, ValueError):
+        return jsonify({"error": "'limit' must be an integer"}), 400
+    if limit < 1:
+        return jsonify({"error": "'limit' must be at least 1"}), 400
+
+    ids = params.get("ids")
+    url = params.get("url")
+    if ids is not None:
+        if not isinstance(ids, list) or not ids:
+            return jsonify({"error": "'ids' must be a non-empty list"}), 400
+        video_ids = []
+        for value in ids:
+            video_id = None
+            if isinstance(value, str):
+                value = value.strip()
+                video_id = value if _VIDEO_ID_RE.fullmatch(value) else _extract_video_id(value)
+            if not video_id:
+                return jsonify({"error": f"Invalid video ID or URL: {value}"}), 400
+            video_ids.append(video_id)
+        video_ids = list(dict.fromkeys(video_ids))
+        if len(video_ids) > _BATCH_MAX_VIDEOS:
+            return jsonify({"error": f"Too many videos (max {_BATCH_MAX_VIDEOS})"}), 413
+        video_ids = video_ids[:limit]
+        header = {"type": "batch", "count": len(video_ids)}
+    elif isinstance(url, str) and url.strip():
+        try:
+            listing = _list_playlist_cached(url.strip(), limit)
+        except Exception as e:
+            payload, status = _extraction_error(e)
+            return jsonify(payload), status
+        video_ids = listing["videoIds"]
+        header = {"type": "playlist", "id": listing["id"], "title": listing["title"], "count": len(video_ids)}
+    else:
+        return jsonify({"error": "Provide a playlist 'url' or an 'ids' list"}), 400
+
+    budget = None if request.environ.get("voxtext.asgi") else _BATCH_TIME_BUDGET
+    response = Response(_stream_batch(header, video_ids, parts, lang, budget), mimetype="application/x-ndjson")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+# Max video duration (seconds) allowed per download quality
+_DOWNLOAD_DURATION_LIMITS = {
+    "720p HD": 2700,
+    "480p": 3600,
+    "360p": 7200,
+    "240p": 7200,
+    "Audio Only": 3600,
+}
+_QUALITY_HEIGHT = {"720p HD": 720, "480p": 480, "360p": 360, "240p": 240}
+
+# Downloaded files are kept in a content-addressed cache keyed by (video ID, quality,
+# format selector), so repeat downloads are served from disk without yt-dlp or ffmpeg.
+_ARTIFACT_DIR = os.path.join(_CACHE_DIR, "artifacts")
+_ARTIFACT_CACHE_BYTES = int(os.environ.get("VOXTEXT_ARTIFACT_CACHE_BYTES", str(5 * 1024 ** 3)))
+# Files touched within this window are kept even when the cache is over budget, so a
+# client can resume a dropped download; only the hard ceiling evicts them. The file
+# just added is never evicted, so it alone can exceed the ceiling when it is larger.
+_ARTIFACT_RETENTION = int(os.environ.get("VOXTEXT_ARTIFACT_RETENTION", "3600"))
+_ARTIFACT_CACHE_HARD_BYTES = int(
+    os.environ.get("VOXTEXT_ARTIFACT_CACHE_HARD_BYTES", str(_ARTIFACT_CACHE_BYTES + _ARTIFACT_CACHE_BYTES // 4))
+)
+
+
+class _ArtifactCache(_SQLiteStore):
+    """Disk cache of downloaded media files with a byte budget and LRU eviction.
+
+    The index (path, size, last access) and the hit/miss/bytes-saved counters are
+    in the shared SQLite file; the files themselves live under `root`.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS artifacts (
+            key TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mimetype TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS artifacts_lru ON artifacts (last_access);
+        CREATE TABLE IF NOT EXISTS artifact_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            hits INTEGER NOT NULL DEFAULT 0,
+            misses INTEGER NOT NULL DEFAULT 0,
+            bytes_saved INTEGER NOT NULL DEFAULT 0,
+            evictions INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO artifact_stats (id) VALUES (1);
+    """
+
+    def __init__(self, path, root, max_bytes, retention=0, hard_max_bytes=None):
+        super().__init__(path)
+        self.root = root
+        self.max_bytes = max_bytes
+        self.retention = retention
+        self.hard_max_bytes = max(hard_max_bytes if hard_max_bytes is not None else max_bytes, max_bytes)
+
+    @staticmethod
+    def make_key(video_id, quality, format_selector):
+        return hashlib.sha256(f"{video_id}|{quality}|{format_selector}".encode("utf-8")).hexdigest()
+
+    def get(self, key, record_stats=True):
+        """Return the artifact record for `key`, or None on a miss."""
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT path, size, mimetype, filename, created_at FROM artifacts WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or not os.path.exists(row[0]):
+            if row is not None:
+                conn.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+            if record_stats:
+                conn.execute("UPDATE artifact_stats SET misses = misses + 1 WHERE id = 1")
+            return None
+        conn.execute("UPDATE artifacts SET last_access = ? WHERE key = ?", (time.time(), key))
+        if record_stats:
+            conn.execute(
+                "UPDATE artifact_stats SET hits = hits + 1, bytes_saved = bytes_saved + ? WHERE id = 1",
+                (row[1],),
+            )
+        return {"key": key, "path": row[0], "size": row[1], "mimetype": row[2],
+                "filename": row[3], "createdAt": row[4]}
+
+    def record_hit(self, artifact):
+        """Count a hit for a lookup made with record_stats=False."""
+        self._conn().execute(
+            "UPDATE artifact_stats SET hits = hits + 1, bytes_saved = bytes_saved + ? WHERE id = 1",
+            (artifact["size"],),
+        )
+
+    def put(self, key, src_path, mimetype, filename):
+        """Move a finished download into the cache and return its record."""
+        ext = os.path.splitext(src_path)[1]
+        dest_dir = os.path.join(self.root, key[:2])
+        os.makedirs(dest_dir, exist_ok=True)
+        dest = os.path.join(dest_dir, key + ext)
+        shutil.move(src_path, dest)
+        size = os.path.getsize(dest)
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO artifacts (key, path, size, mimetype, filename, created_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, dest, size, mimetype, filename, now, now),
+        )
+        self._evict(conn, keep=key)
+        return {"key": key, "path": dest, "size": size, "mimetype": mimetype,
+                "filename": filename, "createdAt": now}
+
+    def _evict(self, conn, keep):
+        """Evict least recently used files down to the budget, sparing those touched
+        within the retention window unless the total is above the hard ceiling."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        retained_since = time.time() - self.retention
+        evicted = 0
+        for key, path, size, last_access in conn.execute(
+            "SELECT key, path, size, last_access FROM artifacts WHERE key != ? ORDER BY last_access", (keep,),
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            # Rows are oldest first, so every later one is retained too
+            if last_access >= retained_since and total <= self.hard_max_bytes:
+                break
+            # Files already being sent stay readable after unlink on POSIX
+            try:
                 os.remove(path)
-        except Exception:
-            pass
-    threading.Thread(target=cleanup, daemon=True).start()
+            except OSError:
+                pass
+            conn.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        conn.execute("UPDATE artifact_stats SET evictions = evictions + ? WHERE id = 1", (evicted,))
+
+    def stats(self):
+        conn = self._conn()
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts").fetchone()
+        hits, misses, bytes_saved, evictions = conn.execute(
+            "SELECT hits, misses, bytes_saved, evictions FROM artifact_stats WHERE id = 1"
+        ).fetchone()
+        lookups = hits + misses
+        return {
+            "backend": "disk",
+            "entries": count,
+            "bytes": total,
+            "maxBytes": self.max_bytes,
+            "hardMaxBytes": self.hard_max_bytes,
+            "retentionSeconds": self.retention,
+            "hits": hits,
+            "misses": misses,
+            "bytesSaved": bytes_saved,
+            "evictions": evictions,
+            "hitRatio": round(hits / lookups, 4) if lookups else None,
+        }
+
+
+_artifacts = _ArtifactCache(
+    _CACHE_DB_PATH, _ARTIFACT_DIR, _ARTIFACT_CACHE_BYTES, _ARTIFACT_RETENTION, _ARTIFACT_CACHE_HARD_BYTES
+)
 
 
 @app.route("/api/download", methods=["GET"])
 def download_video():
-    """Download video in specified quality, send file, then delete."""
+    """Download video in specified quality and send it from the artifact cache.
+
+    Cached files are served with ETag/Last-Modified and honour Range/If-Range, so
+    interrupted downloads resume and download managers can fetch segments in parallel.
+    """
     url = request.args.get("url")
     quality = request.args.get("quality")
     if not url or not quality:
         return jsonify({"error": "Missing 'url' or 'quality' parameter"}), 400
+    stream = request.args.get("stream", "").lower() in ("1", "true", "yes")
+    # Audio Only: "native" (default) keeps YouTube's m4a/opus stream; "mp3" transcodes
+    requested_audio = (request.args.get("audio_format") or "native").lower()
+    if requested_audio not in _AUDIO_FORMATS:
+        return jsonify({"error": f"Invalid audio_format: {requested_audio}"}), 400
+
+    # A resumed or repeated download is answered from disk before any extraction,
+    # so each Range request costs no yt-dlp call
+    video_id = _extract_video_id(url)
+    if video_id and quality in _DOWNLOAD_DURATION_LIMITS and not stream:
+        for audio_format in _audio_format_candidates(quality, requested_audio):
+            artifact = _artifacts.get(_artifact_key(video_id, quality, audio_format), record_stats=False)
+            if artifact:
+                _artifacts.record_hit(artifact)
+                return _send_artifact(artifact)
+
+    summary, error = _prepare_download(url, quality)
+    if error:
+        return jsonify(error[0]), error[1]
+    audio_format = _resolve_audio_format(summary, requested_audio) if quality == "Audio Only" else None
+
+    if stream:
+        return _stream_download(summary, quality, audio_format)
+
+    artifact_key = _artifact_key(summary.id, quality, audio_format)
+    artifact = _artifacts.get(artifact_key)
+    if artifact:
+        return _send_artifact(artifact)
 
-    DURATION_LIMITS = {
-        "720p HD": 2700,
-        "480p": 3600,
-        "360p": 7200,
-        "240p": 7200,
-        "Audio Only": 3600,
-    }
-    if quality not in DURATION_LIMITS:
-        return jsonify({"error": f"Invalid quality: {quality}"}), 400
+    temp_dir = tempfile.mkdtemp()
+    try:
+        filepath, ext, mimetype = _download_to_dir(url, quality, temp_dir, audio_format)
+        if not filepath:
+            return jsonify({"error": "Download completed but file not found"}), 500
+        artifact = _artifacts.put(artifact_key, filepath, mimetype, _download_filename(summary, ext))
+        return _send_artifact(artifact)
+
+    except Exception as e:
+        return jsonify({"error": f"Download failed: {str(e)}"}), 500
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _artifact_key(video_id, quality, audio_format=None):
+    plan = _download_plan(quality, audio_format)
+    return _ArtifactCache.make_key(video_id, quality, f"{plan['format']}|{plan['ext']}")
+
+
+def _audio_format_candidates(quality, requested):
+    """Concrete variants a request may map to, for cache lookups made before extraction."""
+    if quality != "Audio Only":
+        return [None]
+    if requested == "native":
+        return list(_NATIVE_AUDIO_FORMATS)
+    return [requested]
+
+
+def _send_artifact(artifact):
+    """Send a cached artifact; send_file answers conditional and Range requests."""
+    # The cache key alone is not enough for the ETag: an evicted and re-downloaded
+    # file can differ byte for byte, and If-Range must not splice the two together.
+    etag = hashlib.sha1(f"{artifact['key']}:{artifact['size']}:{artifact['createdAt']}".encode()).hexdigest()
+    response = send_file(artifact["path"], mimetype=artifact["mimetype"], as_attachment=True,
+                         download_name=artifact["filename"], conditional=True, etag=etag,
+                         last_modified=artifact["createdAt"])
+    response.headers["Accept-Ranges"] = "bytes"
+    return response
+
+
+def _prepare_download(url, quality):
+    """Validate a download request. Returns (summary, None) or (None, (payload, status))."""
+    if quality not in _DOWNLOAD_DURATION_LIMITS:
+        return None, ({"error": f"Invalid quality: {quality}"}, 400)
 
     try:
-        info = _extract_info_cached(url)
+        summary = _extract_info_cached(url)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return None, ({"error": str(e)}, 500)
+
+    duration = summary.duration or 0
+    limit = _DOWNLOAD_DURATION_LIMITS[quality]
+    if duration > limit:
+        return None, ({"error": f"Video too long for {quality}. Max: {limit // 60} minutes"}, 400)
+    return summary, None
+
+
+def _download_filename(summary, ext):
+    title = summary.title or "video"
+    # Sanitize title for filename: remove characters invalid in filenames
+    safe_title = re.sub(r'[<>:"/\\|?*]', '', title).strip()
+    return f"VoxText-AI_{safe_title}.{ext}"
+
+
+# Audio Only variants. The native ones hand back YouTube's own audio stream: m4a (AAC)
+# as downloaded, opus remuxed out of its webm container without re-encoding. MP3 needs
+# a full decode + encode, so it is only used when asked for or when neither exists.
+_AUDIO_PLANS = {
+    "m4a": {
+        "format": "bestaudio[ext=m4a]",
+        "postprocessors": [],
+        "ext": "m4a",
+        "mimetype": "audio/mp4",
+    },
+    "opus": {
+        "format": "bestaudio[acodec=opus]",
+        "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": "opus"}],
+        "ext": "opus",
+        "mimetype": "audio/ogg",
+    },
+    "mp3": {
+        "format": "bestaudio/best",
+        "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "192"}],
+        "ext": "mp3",
+        "mimetype": "audio/mpeg",
+    },
+}
+_AUDIO_FORMATS = ("native", "m4a", "opus", "mp3")
+_NATIVE_AUDIO_FORMATS = ("m4a", "opus")
+
+
+def _native_audio_variants(info):
+    """The native Audio Only variants among the formats yt-dlp reported."""
+    available = set()
+    for f in info.get("formats") or []:
+        if f.get("acodec") in (None, "none") or f.get("vcodec") not in (None, "none"):
+            continue
+        if f.get("ext") == "m4a":
+            available.add("m4a")
+        if (f.get("acodec") or "").startswith("opus"):
+            available.add("opus")
+    return [variant for variant in _NATIVE_AUDIO_FORMATS if variant in available]
+
+
+def _select_audio_sources(info):
+    """Best direct-URL audio-only format per native variant ({"m4a": f, "opus": f}, or None)."""
+    sources = dict.fromkeys(_NATIVE_AUDIO_FORMATS)
+    for f in info.get("formats") or []:
+        if not _is_http_format(f) or f.get("acodec") in (None, "none") or f.get("vcodec") not in (None, "none"):
+            continue
+        for variant, matches in (("m4a", f.get("ext") == "m4a"), ("opus", f.get("acodec").startswith("opus"))):
+            if matches and (not sources[variant] or (f.get("abr") or 0) > (sources[variant].get("abr") or 0)):
+                sources[variant] = f
+    return sources
+
+
+def _resolve_audio_format(summary, requested):
+    """Pick the concrete Audio Only variant for a VideoSummary."""
+    if requested == "mp3":
+        return "mp3"
+    preference = [requested] if requested in _NATIVE_AUDIO_FORMATS else []
+    for variant in preference + list(_NATIVE_AUDIO_FORMATS):
+        if variant in summary.audio_variants:
+            return variant
+    return "mp3"
+
+
+def _download_plan(quality, audio_format=None):
+    """yt-dlp format selector, postprocessors and output type for a download."""
+    if quality == "Audio Only":
+        return _AUDIO_PLANS[audio_format or "mp3"]
+    height = _QUALITY_HEIGHT[quality]
+    return {
+        "format": f"bestvideo[height<={height}]+bestaudio/best[height<={height}]/best",
+        "postprocessors": [],
+        "merge_output_format": "mp4",
+        "ext": "mp4",
+        "mimetype": "video/mp4",
+    }
 
-    duration = info.get("duration") or 0
-    if duration > DURATION_LIMITS[quality]:
-        return jsonify({"error": f"Video too long for {quality}. Max: {DURATION_LIMITS[quality] // 60} minutes"}), 400
 
-    QUALITY_HEIGHT = {"720p HD": 720, "480p": 480, "360p": 360, "240p": 240}
-    temp_dir = tempfile.mkdtemp()
+def _download_to_dir(url, quality, out_dir, audio_format=None, progress_hooks=None, postprocessor_hooks=None):
+    """Download `url` at `quality` into out_dir with yt-dlp.
+
+    Returns (filepath, ext, mimetype); filepath is None if yt-dlp produced no file.
+    """
+    common_opts = {
+        "quiet": True,
+        "no_warnings": True,
+        "noplaylist": True,
+        "geo_bypass": True,
+        "socket_timeout": 30,
+        "retries": 2,
+        "fragment_retries": 2,
+        "http_headers": _YTDL_HTTP_HEADERS,
+    }
+    if progress_hooks:
+        common_opts["progress_hooks"] = progress_hooks
+    if postprocessor_hooks:
+        common_opts["postprocessor_hooks"] = postprocessor_hooks
+
+    plan = _download_plan(quality, audio_format)
+    ydl_opts = {
+        "format": plan["format"],
+        "postprocessors": plan["postprocessors"],
+        "outtmpl": os.path.join(out_dir, "%(title)s.%(ext)s"),
+        **common_opts,
+    }
+    if plan.get("merge_output_format"):
+        ydl_opts["merge_output_format"] = plan["merge_output_format"]
+    ext = plan["ext"]
+    mimetype = plan["mimetype"]
+
+    # Per-download format, output path and hooks are baked in at construction, so
+    # downloads get a fresh instance (still sharing the cookie jar) instead of a pooled one
+    with _new_youtube_dl(ydl_opts) as ydl:
+        ydl.download([url])
+
+    # Find the downloaded file
+    files = glob_mod.glob(os.path.join(out_dir, f"*.{ext}"))
+    if not files:
+        files = glob_mod.glob(os.path.join(out_dir, "*.*"))
+    return (files[0] if files else None), ext, mimetype
+
+
+# Streaming downloads: bytes are piped from an ffmpeg subprocess straight to the client,
+# so the first byte goes out as soon as the source produces it and nothing is written
+# to disk. ffmpeg reads the direct format URLs from the cached VideoSummary, so a
+# stream never runs another YouTube extraction. Streams are copied, not re-encoded
+# (except MP3); video goes out as fragmented MP4, which needs no seekable output.
+_STREAM_CHUNK_SIZE = 64 * 1024
+_STREAM_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/121.0.0.0 Safari/537.36"
+)
+
+
+def _is_http_format(f):
+    return (f.get("protocol") or "https") in ("http", "https") and bool(f.get("url"))
+
+
+def _select_stream_formats(info, height):
+    """Pick (progressive, video_only, audio_only) formats for a streaming download.
+
+    progressive is set when a single-file format is at least as tall as the best
+    video-only candidate, in which case no merge is needed.
+    """
+    progressive = video_only = audio_only = None
+    for f in info.get("formats") or []:
+        if not _is_http_format(f):
+            continue
+        has_video = f.get("vcodec") not in (None, "none") and f.get("height")
+        has_audio = f.get("acodec") not in (None, "none")
+        if has_video and f["height"] > (height or 0):
+            continue
+        if has_video and has_audio:
+            if not progressive or (f["height"], f.get("tbr") or 0) > (progressive["height"], progressive.get("tbr") or 0):
+                progressive = f
+        elif has_video:
+            # MP4 (H.264) first so the fragmented MP4 remux needs no transcoding
+            rank = (f.get("ext") == "mp4", f["height"], f.get("tbr") or 0)
+            if not video_only or rank > (video_only.get("ext") == "mp4", video_only["height"], video_only.get("tbr") or 0):
+                video_only = f
+        elif has_audio:
+            rank = (f.get("ext") == "m4a", f.get("abr") or 0)
+            if not audio_only or rank > (audio_only.get("ext") == "m4a", audio_only.get("abr") or 0):
+                audio_only = f
+    if progressive and video_only and video_only["height"] > progressive["height"]:
+        progressive = None
+    return progressive, video_only, audio_only
+
+
+def _ffmpeg_input_args(f):
+    headers = dict(f.get("http_headers") or {})
+    headers.setdefault("User-Agent", _STREAM_USER_AGENT)
+    header_blob = "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+    return ["-headers", header_blob, "-i", f["url"]]
+
+
+def _build_stream_command(summary, quality, audio_format=None):
+    """Return (argv, ext, mimetype) for the subprocess that produces the stream."""
+    # Chosen at extraction time by _select_stream_formats and _select_audio_sources
+    progressive, video_only, audio_only = summary.stream_formats[quality]
+    ffmpeg = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin"]
+    fragmented_mp4 = ["-movflags", "frag_keyframe+empty_moov+default_base_moof", "-f", "mp4", "pipe:1"]
+
+    if quality == "Audio Only":
+        source = summary.audio_sources.get(audio_format) if audio_format in _NATIVE_AUDIO_FORMATS else None
+        if audio_format == "m4a" and source:
+            return ffmpeg + _ffmpeg_input_args(source) + ["-vn", "-c:a", "copy"] + fragmented_mp4, "m4a", "audio/mp4"
+        if audio_format == "opus" and source:
+            # Kept in a WebM container; remuxing to .opus needs a seekable file
+            return ffmpeg + _ffmpeg_input_args(source) + ["-vn", "-c:a", "copy", "-f", "webm", "pipe:1"], "webm", "audio/webm"
+        if audio_format in _NATIVE_AUDIO_FORMATS:
+            return None
+        source = audio_only or progressive
+        if not source:
+            return None
+        # MP3 is encoded on the fly, matching the buffered endpoint's output
+        cmd = ffmpeg + _ffmpeg_input_args(source) + [
+            "-vn", "-c:a", "libmp3lame", "-b:a", "192k", "-f", "mp3", "pipe:1",
+        ]
+        return cmd, "mp3", "audio/mpeg"
+
+    if progressive:
+        return ffmpeg + _ffmpeg_input_args(progressive) + ["-c", "copy"] + fragmented_mp4, "mp4", "video/mp4"
+
+    if not video_only:
+        return None
+    cmd = ffmpeg + _ffmpeg_input_args(video_only)
+    if audio_only:
+        cmd += _ffmpeg_input_args(audio_only) + ["-map", "0:v:0", "-map", "1:a:0"]
+    return cmd + ["-c", "copy"] + fragmented_mp4, "mp4", "video/mp4"
+
+
+def _iter_process_output(proc, first_chunk, stderr_file):
+    """Yield a subprocess's stdout; closing the generator (client gone) kills it."""
     try:
-        cookies_path = os.path.join(os.path.dirname(__file__), "youtube_cookies.txt")
-        common_opts = {
-            "quiet": True,
-            "no_warnings": True,
-            "noplaylist": True,
-            "geo_bypass": True,
-            "socket_timeout": 30,
-            "retries": 2,
-            "fragment_retries": 2,
-            "http_headers": {
-                "User-Agent": (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/121.0.0.0 Safari/537.36"
-                ),
-                "Accept-Language": "en-US,en;q=0.9",
-            },
-        }
-        if os.path.exists(cookies_path):
-            common_opts["cookiefile"] = cookies_path
-
-        if quality == "Audio Only":
-            ydl_opts = {
-                "format": "bestaudio/best",
-                "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "192"}],
-                "outtmpl": os.path.join(temp_dir, "%(title)s.%(ext)s"),
-                **common_opts,
-            }
-            ext = "mp3"
-            mimetype = "audio/mpeg"
-        else:
-            height = QUALITY_HEIGHT[quality]
-            ydl_opts = {
-                "format": f"bestvideo[height<={height}]+bestaudio/best[height<={height}]/best",
-                "merge_output_format": "mp4",
-                "outtmpl": os.path.join(temp_dir, "%(title)s.%(ext)s"),
-                **common_opts,
-            }
-            ext = "mp4"
-            mimetype = "video/mp4"
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            if hasattr(ydl, 'cookiejar'):
-                for cookie in _cookie_jar:
-                    ydl.cookiejar.set_cookie(cookie)
-            ydl.download([url])
-            if hasattr(ydl, 'cookiejar'):
-                for cookie in ydl.cookiejar:
-                    _cookie_jar.set_cookie(cookie)
-
-        # Find the downloaded file
-        files = glob_mod.glob(os.path.join(temp_dir, f"*.{ext}"))
-        if not files:
-            files = glob_mod.glob(os.path.join(temp_dir, "*.*"))
-        if not files:
-            return jsonify({"error": "Download completed but file not found"}), 500
+        yield first_chunk
+        while True:
+            chunk = proc.stdout.read(_STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+        proc.wait()
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        stderr_file.close()
+
+
+def _attachment_header(filename):
+    """Content-Disposition value for `filename`, with an RFC 5987 form for non-ASCII names
+    (what send_file emits for download_name)."""
+    try:
+        filename.encode("ascii")
+        return f'attachment; filename="{filename}"'
+    except UnicodeEncodeError:
+        fallback = unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode("ascii")
+        quoted = urllib.parse.quote(filename, safe="!#$&+-.^_`|~")
+        return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quoted}"
+
+
+def _stream_download(summary, quality, audio_format=None):
+    """Serve a download as a chunked stream from an ffmpeg pipe."""
+    built = _build_stream_command(summary, quality, audio_format)
+    if not built:
+        return jsonify({"error": f"No streamable format available for {quality}"}), 404
+    cmd, ext, mimetype = built
+    # stderr goes to a temp file: a pipe nobody reads while streaming could fill up
+    # and stall the child
+    stderr_file = tempfile.TemporaryFile()
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, bufsize=0)
+    except OSError as e:
+        stderr_file.close()
+        return jsonify({"error": f"Download failed: {str(e)}"}), 500
 
-        filepath = files[0]
-        title = info.get("title") or "video"
-        # Sanitize title for filename: remove characters invalid in filenames
-        safe_title = re.sub(r'[<>:"/\\|?*]', '', title).strip()
-        filename = f"VoxText-AI_{safe_title}.{ext}"
+    # Wait for the first bytes so a failure can still be reported as a JSON error
+    first_chunk = proc.stdout.read(_STREAM_CHUNK_SIZE)
+    if not first_chunk:
+        proc.wait()
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode("utf-8", "replace").strip()
+        proc.stdout.close()
+        stderr_file.close()
+        return jsonify({"error": f"Download failed: {stderr or 'no data received'}"}), 500
+
+    response = Response(_iter_process_output(proc, first_chunk, stderr_file), mimetype=mimetype, direct_passthrough=True)
+    response.headers["Content-Disposition"] = _attachment_header(_download_filename(summary, ext))
+    # Keep reverse proxies (nginx) from buffering the whole stream
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+# Download jobs: POST /api/jobs queues a download on a bounded pool and returns at once,
+# so a long download no longer holds a request worker for its whole duration. Job state
+# lives in the shared cache (any worker can answer a status poll) and the finished file
+# in the artifact cache.
+_JOBS_DIR = os.path.join(_CACHE_DIR, "jobs")  # Scratch space while a job downloads
+_JOB_WORKERS = int(os.environ.get("VOXTEXT_JOB_WORKERS", "2"))
+_JOB_QUEUE_LIMIT = int(os.environ.get("VOXTEXT_JOB_QUEUE_LIMIT", "8"))
+_JOB_TTL = 3600  # 1 hour
+_JOB_PROGRESS_INTERVAL = 0.5  # Min seconds between progress writes
+_JOB_EVENTS_KEEPALIVE = 15
+# An events stream is closed with a reconnect hint before gunicorn's 120 s worker
+# timeout, so a sync worker is never killed (with its running jobs) for holding it
+_JOB_EVENTS_MAX_DURATION = 100
+_JOB_EVENTS_RETRY_MS = 2000
+# The worker running a job refreshes its heartbeat this often; a queued or running
+# job whose heartbeat is older than _JOB_STALE_AFTER lost its worker (recycled or
+# killed) and is reported as failed
+_JOB_HEARTBEAT_INTERVAL = 10
+_JOB_STALE_AFTER = 3 * _JOB_HEARTBEAT_INTERVAL
+_JOB_TERMINAL_STATUSES = ("finished", "failed")
+_jobs = _make_cache("jobs", _JOB_TTL)
+_job_executor = ThreadPoolExecutor(max_workers=_JOB_WORKERS, thread_name_prefix="voxtext-job")
+# Running + queued jobs per worker process; submissions beyond this are rejected
+_job_slots = threading.BoundedSemaphore(_JOB_WORKERS + _JOB_QUEUE_LIMIT)
+# Unfinished jobs owned by this worker process, kept alive by _job_heartbeat
+_local_jobs = {}
+_local_jobs_lock = threading.Lock()
+_job_heartbeat_pid = None
+
+
+def _update_job(job, **fields):
+    with _local_jobs_lock:
+        job.update(fields)
+        job["updatedAt"] = job["heartbeatAt"] = time.time()
+        _jobs.set(job["id"], job)
+
+
+def _job_heartbeat():
+    while True:
+        time.sleep(_JOB_HEARTBEAT_INTERVAL)
+        with _local_jobs_lock:
+            jobs = list(_local_jobs.values())
+        for job in jobs:
+            with _local_jobs_lock:
+                if job["id"] not in _local_jobs:
+                    continue
+                job["heartbeatAt"] = time.time()
+                try:
+                    _jobs.set(job["id"], job)
+                except Exception as e:
+                    print(f"[jobs] Heartbeat for {job['id']} failed: {e}")
+
+
+def _track_job(job):
+    """Record this worker as the job's owner and keep its heartbeat going."""
+    global _job_heartbeat_pid
+    job["workerPid"] = os.getpid()
+    job["heartbeatAt"] = time.time()
+    with _local_jobs_lock:
+        _local_jobs[job["id"]] = job
+        # Started on first use, so each forked worker runs its own
+        if _job_heartbeat_pid != os.getpid():
+            _job_heartbeat_pid = os.getpid()
+            threading.Thread(target=_job_heartbeat, name="voxtext-job-heartbeat", daemon=True).start()
+
+
+def _untrack_job(job):
+    with _local_jobs_lock:
+        _local_jobs.pop(job["id"], None)
+
+
+def _load_job(job_id, record_stats=True):
+    """Read a job, failing it if its worker stopped sending heartbeats."""
+    job = _jobs.get(job_id, record_stats=record_stats)
+    if job is None or job["status"] in _JOB_TERMINAL_STATUSES:
+        return job
+    if time.time() - job.get("heartbeatAt", job["updatedAt"]) > _JOB_STALE_AFTER:
+        job.update(
+            status="failed",
+            error=f"Download worker (pid {job.get('workerPid')}) stopped before the job finished",
+            updatedAt=time.time(),
+        )
+        _jobs.set(job_id, job)
+    return job
+
+
+def _job_view(job):
+    """Public view of a job (internal paths left out)."""
+    view = {
+        "jobId": job["id"],
+        "status": job["status"],
+        "quality": job["quality"],
+        "audioFormat": job.get("audioFormat"),
+        "progress": job["progress"],
+        "error": job.get("error"),
+        "createdAt": job["createdAt"],
+        "updatedAt": job["updatedAt"],
+    }
+    if job["status"] == "finished":
+        view["fileUrl"] = f"/api/jobs/{job['id']}/file"
+        view["sizeBytes"] = job.get("size")
+        view["cached"] = job.get("cached", False)
+    return view
+
+
+class _JobProgress:
+    """yt-dlp progress/postprocessor hooks that publish a job's progress.
+
+    Merged downloads fetch video and audio as separate files, so per-file counters
+    are summed into one overall figure.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.files = {}
+        self.last_write = 0
+
+    def on_download(self, d):
+        total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
+        self.files[d.get("filename")] = (d.get("downloaded_bytes") or 0, total)
+        now = time.time()
+        if d.get("status") == "downloading" and now - self.last_write < _JOB_PROGRESS_INTERVAL:
+            return
+        self.last_write = now
+        done = sum(f[0] for f in self.files.values())
+        expected = sum(f[1] for f in self.files.values())
+        _update_job(self.job, progress={
+            "stage": "downloading",
+            "percent": round(min(done / expected, 1) * 100, 1) if expected else None,
+            "downloadedBytes": done,
+            "totalBytes": expected or None,
+            "speed": d.get("speed"),
+            "eta": d.get("eta"),
+        })
+
+    def on_postprocess(self, d):
+        if d.get("status") == "started":
+            _update_job(self.job, progress={**self.job["progress"], "stage": "processing", "eta": None})
 
-        response = send_file(filepath, mimetype=mimetype, as_attachment=True, download_name=filename)
-        _delayed_cleanup(temp_dir, delay=10)
-        return response
 
+def _finish_job(job, artifact, cached=False):
+    _update_job(
+        job,
+        status="finished",
+        progress={**job["progress"], "stage": "done", "percent": 100.0,
+                  "downloadedBytes": artifact["size"], "totalBytes": artifact["size"], "eta": 0},
+        artifactKey=artifact["key"],
+        size=artifact["size"],
+        cached=cached,
+    )
+
+
+def _run_job(job, summary):
+    job_dir = os.path.join(_JOBS_DIR, job["id"])
+    try:
+        os.makedirs(job_dir, exist_ok=True)
+        _update_job(job, status="running")
+        progress = _JobProgress(job)
+        filepath, ext, mimetype = _download_to_dir(
+            job["url"], job["quality"], job_dir, job.get("audioFormat"),
+            progress_hooks=[progress.on_download],
+            postprocessor_hooks=[progress.on_postprocess],
+        )
+        if not filepath:
+            raise RuntimeError("Download completed but file not found")
+        artifact_key = _artifact_key(summary.id, job["quality"], job.get("audioFormat"))
+        artifact = _artifacts.put(artifact_key, filepath, mimetype, _download_filename(summary, ext))
+        _finish_job(job, artifact)
     except Exception as e:
-        shutil.rmtree(temp_dir, ignore_errors=True)
-        return jsonify({"error": f"Download failed: {str(e)}"}), 500
+        _update_job(job, status="failed", error=f"Download failed: {str(e)}")
+    finally:
+        _untrack_job(job)
+        shutil.rmtree(job_dir, ignore_errors=True)
+        _job_slots.release()
+
+
+@app.route("/api/jobs", methods=["POST"])
+def create_job():
+    """Queue a download job. Takes `url`, `quality` and optional `audio_format`
+    (JSON body or form fields)."""
+    data = request.get_json(silent=True) or request.form
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    invalid = [name for name in ("url", "quality", "audio_format")
+               if data.get(name) is not None and not isinstance(data.get(name), str)]
+    if invalid:
+        return jsonify({"error": f"'{invalid[0]}' must be a string"}), 400
+    url = data.get("url")
+    quality = data.get("quality")
+    if not url or not quality:
+        return jsonify({"error": "Missing 'url' or 'quality' parameter"}), 400
+    requested_audio = (data.get("audio_format") or "native").lower()
+    if requested_audio not in _AUDIO_FORMATS:
+        return jsonify({"error": f"Invalid audio_format: {requested_audio}"}), 400
+
+    summary, error = _prepare_download(url, quality)
+    if error:
+        return jsonify(error[0]), error[1]
+    audio_format = _resolve_audio_format(summary, requested_audio) if quality == "Audio Only" else None
+
+    now = time.time()
+    job = {
+        "id": uuid.uuid4().hex,
+        "url": url,
+        "quality": quality,
+        "audioFormat": audio_format,
+        "status": "queued",
+        "progress": {"stage": "queued", "percent": 0.0},
+        "createdAt": now,
+        "updatedAt": now,
+    }
+    artifact = _artifacts.get(_artifact_key(summary.id, quality, audio_format))
+    if artifact:
+        # Already downloaded: the job is finished before it starts
+        _finish_job(job, artifact, cached=True)
+    else:
+        if not _job_slots.acquire(blocking=False):
+            return jsonify({"error": "Too many downloads in progress. Please try again shortly."}), 503
+        _track_job(job)
+        _jobs.set(job["id"], job)
+        try:
+            _job_executor.submit(_run_job, job, summary)
+        except Exception:
+            _untrack_job(job)
+            _job_slots.release()
+            raise
+
+    response = jsonify({
+        **_job_view(job),
+        "statusUrl": f"/api/jobs/{job['id']}",
+        "eventsUrl": f"/api/jobs/{job['id']}/events",
+    })
+    response.status_code = 202
+    response.headers["Location"] = f"/api/jobs/{job['id']}"
+    return response
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = _load_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify(_job_view(job))
+
+
+@app.route("/api/jobs/<job_id>/events", methods=["GET"])
+def get_job_events(job_id):
+    """Server-Sent Events stream of a job's status until it finishes or fails.
+
+    Streams last at most _JOB_EVENTS_MAX_DURATION seconds and then end with a
+    `reconnect` event; the client reconnects (EventSource does on its own) or polls.
+    """
+    if _load_job(job_id) is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+
+    def generate():
+        started = time.time()
+        last_update = None
+        last_sent = started
+        yield f"retry: {_JOB_EVENTS_RETRY_MS}\n\n"
+        while True:
+            job = _load_job(job_id, record_stats=False)
+            if job is None:
+                yield "event: error\ndata: {\"error\": \"Job not found or expired\"}\n\n"
+                return
+            if job["updatedAt"] != last_update:
+                last_update = job["updatedAt"]
+                last_sent = time.time()
+                yield f"data: {json_lib.dumps(_job_view(job))}\n\n"
+            elif time.time() - last_sent > _JOB_EVENTS_KEEPALIVE:
+                last_sent = time.time()
+                yield ": keepalive\n\n"
+            if job["status"] in _JOB_TERMINAL_STATUSES:
+                return
+            if time.time() - started > _JOB_EVENTS_MAX_DURATION:
+                yield f"event: reconnect\ndata: {json_lib.dumps({'statusUrl': f'/api/jobs/{job_id}'})}\n\n"
+                return
+            time.sleep(_JOB_PROGRESS_INTERVAL)
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@app.route("/api/jobs/<job_id>/file", methods=["GET"])
+def get_job_file(job_id):
+    job = _load_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    if job["status"] != "finished":
+        return jsonify({"error": f"Job is {job['status']}", "status": job["status"]}), 409
+    artifact = _artifacts.get(job["artifactKey"], record_stats=False)
+    if artifact is None:
+        return jsonify({"error": "Job file has expired"}), 410
+    return _send_artifact(artifact)
+
+
+# ASGI serving mode: `uvicorn server:asgi_app`. The event loop holds connections and
+# hands each request to a bounded pool of handler threads, since yt-dlp and
+# youtube-transcript-api only block. Caption and translation requests go through
+# _async_http on the loop. Beyond _ASGI_MAX_PENDING in-flight requests, new ones
+# get a 503 rather than an ever-growing queue.
+_ASGI_THREADS = int(os.environ.get("VOXTEXT_ASGI_THREADS", "32"))
+_ASGI_MAX_PENDING = int(os.environ.get("VOXTEXT_ASGI_MAX_PENDING", "256"))
+_ASGI_FILE_BLOCK = 256 * 1024  # send_file read size; each block is one thread hop
+
+
+class _AsgiBridge:
+    """Minimal ASGI 3 adapter running a WSGI app on a bounded thread pool."""
+
+    def __init__(self, wsgi_app, threads, max_pending):
+        self.wsgi_app = wsgi_app
+        self.threads = threads
+        self.max_pending = max_pending
+        self.executor = None
+        self.pending = 0
+        self.rejected = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    def _start(self):
+        # Created lazily in the serving process, never inherited across a fork
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="voxtext-asgi")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self._start()
+                await _async_http.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await _async_http.close()
+                if self.executor is not None:
+                    self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    def _environ(scope, body):
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client") or ("", 0)
+        root_path = scope.get("root_path", "")
+        path = scope["path"]
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            # WSGI carries the raw path bytes as latin-1 strings
+            "SCRIPT_NAME": root_path.encode("utf-8").decode("latin-1"),
+            "PATH_INFO": path.encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope["query_string"].decode("latin-1"),
+            "SERVER_NAME": server[0],
+            "SERVER_PORT": str(server[1]),
+            "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+            "REMOTE_ADDR": client[0],
+            "REMOTE_PORT": str(client[1]),
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+            "wsgi.file_wrapper": lambda file, buffer_size=8192: FileWrapper(file, max(buffer_size, _ASGI_FILE_BLOCK)),
+            # Lets long-running routes (e.g. /api/batch) skip limits meant for sync WSGI workers
+            "voxtext.asgi": True,
+        }
+        for name, value in scope["headers"]:
+            key = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            if key == "CONTENT_LENGTH":
+                continue
+            if key != "CONTENT_TYPE":
+                key = "HTTP_" + key
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    @staticmethod
+    async def _send_error(send, status, message, headers=()):
+        body = json_lib.dumps({"error": message}).encode("utf-8")
+        await send({"type": "http.response.start", "status": status, "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            *headers,
+        ]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _reject(self, send):
+        self.rejected += 1
+        await self._send_error(send, 503, "Server busy. Please try again shortly.", [(b"retry-after", b"1")])
+
+    async def _http(self, scope, receive, send):
+        # The body is buffered before the WSGI app sees it, so MAX_CONTENT_LENGTH is
+        # enforced here, from the declared length and again while reading
+        limit = self.wsgi_app.config.get("MAX_CONTENT_LENGTH")
+        too_large = "Request body too large"
+        declared = dict(scope["headers"]).get(b"content-length")
+        if limit is not None and declared is not None and declared.isdigit() and int(declared) > limit:
+            await self._send_error(send, 413, too_large)
+            return
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body += message.get("body", b"")
+            if limit is not None and len(body) > limit:
+                await self._send_error(send, 413, too_large)
+                return
+            if not message.get("more_body"):
+                break
+        if self.pending >= self.max_pending:
+            await self._reject(send)
+            return
+        self._start()
+        self.pending += 1
+        loop = asyncio.get_running_loop()
+        disconnected = asyncio.Event()
+
+        async def watch_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+
+        def run_app(environ):
+            result = self.wsgi_app(environ, start_response)
+            chunks = iter(result)
+            return result, chunks, next(chunks, None)
+
+        result = None
+        try:
+            result, chunks, chunk = await loop.run_in_executor(self.executor, run_app, self._environ(scope, bytes(body)))
+            await send({"type": "http.response.start", "status": started["status"], "headers": started["headers"]})
+            # Streamed bodies (downloads, job events) pull one chunk per thread hop and
+            # stop early when the client goes away, so the generator's cleanup runs
+            while chunk is not None and not disconnected.is_set():
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                chunk = await loop.run_in_executor(self.executor, next, chunks, None)
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            watcher.cancel()
+            if hasattr(result, "close"):
+                await loop.run_in_executor(self.executor, result.close)
+            self.pending -= 1
+
+    def stats(self):
+        return {
+            "active": self.executor is not None,
+            "threads": self.threads,
+            "pending": self.pending,
+            "maxPending": self.max_pending,
+            "rejected": self.rejected,
+            "asyncHttp": _async_http.active,
+        }
+
+
+asgi_app = _AsgiBridge(app, _ASGI_THREADS, _ASGI_MAX_PENDING)
 
 
 if __name__ == "__main__":
-    # Development server - for production use gunicorn
+    # Development server - for production use gunicorn (server:app) or uvicorn (server:asgi_app)
     app.run(host="0.0.0.0", port=5000, debug=False)
@@ -0,0 +1,109 @@
+"""Cache backend tests: the Redis backend against fakeredis, and the SQLite tier."""
+
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("VOXTEXT_CACHE_DIR", tempfile.mkdtemp(prefix="voxtext-test-"))
+os.environ.setdefault("VOXTEXT_YTDL_PREWARM", "0")
+
+import server  # noqa: E402
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_cache():
+    def make(ttl=300, max_entries=None, max_bytes=None, namespace="test"):
+        return server._RedisCache(fakeredis.FakeRedis(), namespace, ttl, max_entries, max_bytes)
+    return make
+
+
+@pytest.fixture
+def sqlite_cache(tmp_path):
+    def make(ttl=300, max_entries=None, max_bytes=None, namespace="test"):
+        return server._SQLiteCache(str(tmp_path / "cache.sqlite3"), namespace, ttl, max_entries, max_bytes)
+    return make
+
+
+@pytest.fixture(params=["redis", "sqlite"])
+def cache(request, redis_cache, sqlite_cache):
+    return redis_cache if request.param == "redis" else sqlite_cache
+
+
+def test_get_set_round_trip(cache):
+    c = cache()
+    assert c.get("missing") is None
+    c.set("a", {"title": "Video", "formats": [1, 2, 3]})
+    assert c.get("a") == {"title": "Video", "formats": [1, 2, 3]}
+    stats = c.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_replace_keeps_running_totals(cache):
+    c = cache()
+    c.set("a", "x" * 10)
+    c.set("a", "y" * 5000)
+    c.delete("a")
+    c.delete("a")
+    stats = c.stats()
+    assert (stats["entries"], stats["bytes"]) == (0, 0)
+
+
+def test_ttl_expiry(cache):
+    c = cache(ttl=0.05)
+    c.set("a", 1)
+    c.set("b", 2, ttl=60)
+    time.sleep(0.1)
+    assert c.get("a") is None
+    assert c.get("b") == 2
+
+
+def test_lru_eviction_by_entries(cache, monkeypatch):
+    monkeypatch.setattr(server, "_CACHE_TOUCH_INTERVAL", 0)
+    c = cache(max_entries=2)
+    c.set("a", 1)
+    time.sleep(0.01)
+    c.set("b", 2)
+    time.sleep(0.01)
+    assert c.get("a") == 1  # a is now more recent than b
+    time.sleep(0.01)
+    c.set("c", 3)
+    assert c.get("b") is None
+    assert (c.get("a"), c.get("c")) == (1, 3)
+    stats = c.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+
+
+def test_eviction_by_bytes(cache):
+    c = cache(max_bytes=2000)
+    for i in range(10):
+        c.set(str(i), os.urandom(400).hex())
+    stats = c.stats()
+    assert stats["bytes"] <= 2000
+    assert c.get("9") is not None
+
+
+def test_counters_are_batched(cache, monkeypatch):
+    monkeypatch.setattr(server, "_CACHE_STATS_FLUSH_INTERVAL", 3600)
+    c = cache()
+    c.set("a", 1)
+    for _ in range(5):
+        c.get("a")
+    # Nothing written yet; stats() flushes the pending counts first
+    assert c.counters._counts["hits"] == 5
+    assert c.stats()["hits"] == 5
+
+
+def test_redis_totals_start_from_existing_sizes(redis_cache):
+    c = redis_cache()
+    c.set("a", "x" * 100)
+    c.set("b", "x" * 100)
+    c.client.delete(c._usage_key)  # As written before running totals existed
+    fresh = server._RedisCache(c.client, "test", 300, max_entries=2)
+    fresh.set("c", 1)
+    assert fresh.stats()["entries"] == 2
@@ -0,0 +1,209 @@
+"""Caption parser tests: streaming json3/VTT/XML parsing against the old parser, and SegmentStore."""
+
+import json
+import os
+import struct
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("VOXTEXT_CACHE_DIR", tempfile.mkdtemp(prefix="voxtext-test-"))
+os.environ.setdefault("VOXTEXT_YTDL_PREWARM", "0")
+
+import server  # noqa: E402
+
+
+def old_parse_caption_content(raw):
+    """The whole-document parser that iter_caption_segments replaced (condensed copy)."""
+    segments = []
+    try:
+        for event in json.loads(raw).get("events", []):
+            start_ms = event.get("tStartMs", 0)
+            segs = event.get("segs")
+            if not segs:
+                continue
+            text = "".join(s.get("utf8", "") for s in segs).strip().replace("\n", " ")
+            if text:
+                segments.append({"startMs": start_ms, "endMs": start_ms + event.get("dDurMs", 0), "text": text})
+    except (json.JSONDecodeError, KeyError):
+        def vtt_to_ms(ts):
+            parts = ts.replace(",", ".").split(":")
+            if len(parts) == 2:
+                parts = ["0"] + parts
+            if len(parts) != 3:
+                return 0
+            h, m, rest = parts
+            s, _, ms = rest.partition(".")
+            return (int(h) * 3600 + int(m) * 60 + int(s)) * 1000 + int((ms or "0").ljust(3, "0")[:3])
+
+        lines = raw.strip().split("\n")
+        i = 0
+        while i < len(lines):
+            line = lines[i].strip()
+            if "-->" in line:
+                start_str, end_str = line.split("-->")[:2]
+                start_ms, end_ms = vtt_to_ms(start_str.strip()), vtt_to_ms(end_str.strip().split(" ")[0])
+                text_lines = []
+                i += 1
+                while i < len(lines) and lines[i].strip():
+                    text_lines.append(lines[i].strip())
+                    i += 1
+                text = " ".join(text_lines)
+                if text:
+                    segments.append({"startMs": start_ms, "endMs": end_ms, "text": text})
+            i += 1
+    return segments
+
+
+JSON3 = {
+    "wireMagic": "pb3",
+    # Nested objects and a "tStartMs" inside a string, ahead of the events
+    "pens": [{"szPenSize": 100, "note": '{"tStartMs": 1},'}],
+    "wsWinStyles": [{}],
+    "events": [
+        {"tStartMs": 0, "dDurMs": 90000, "id": 1, "wpWinPosId": 1},
+        {"tStartMs": 1000, "dDurMs": 2500, "wWinId": 1, "segs": [
+            {"utf8": "naïve"}, {"utf8": " 日本語", "tOffsetMs": 400}, {"utf8": " தமிழ் 😀", "tOffsetMs": 800},
+        ]},
+        {"tStartMs": 3490, "dDurMs": 10, "aAppend": 1, "segs": [{"utf8": "\n"}]},
+        # Escapes: quotes, backslashes, a control character and a surrogate pair
+        {"tStartMs": 3500, "dDurMs": 2000, "segs": [{"utf8": 'He said "hi" \\ bye\tnow \U0001f600'}]},
+        {"tStartMs": 5500, "dDurMs": 1500, "segs": [{"utf8": '{"tStartMs": 9}, {'}]},
+        {"tStartMs": 7000, "dDurMs": 1000, "segs": [{"utf8": "   "}]},
+        {"tStartMs": 8000, "segs": [{"utf8": "line one\nline two"}]},
+        {"tStartMs": 1234567890123, "dDurMs": 1, "segs": [{"utf8": "late"}]},
+    ],
+}
+
+JSON3_DOCS = {
+    "compact": json.dumps(JSON3, separators=(",", ":"), ensure_ascii=False),
+    "default": json.dumps(JSON3, ensure_ascii=False),
+    "indent": json.dumps(JSON3, indent=2, ensure_ascii=False),
+    # \uXXXX escapes everywhere, so chunks can split inside an escape sequence
+    "ascii": json.dumps(JSON3),
+}
+
+VTT_DOCS = {
+    "vtt": (
+        "WEBVTT\nKind: captions\nLanguage: ta\n\n"
+        "00:00:01.000 --> 00:00:03.500 align:start position:0%\nnaïve 日本語\nதமிழ் 😀\n\n"
+        "00:03.500 --> 00:05.250\nShort timestamps\n\n"
+        "01:02:03,040 --> 01:02:04,000\nComma milliseconds\n\n"
+        "00:00:06.000 --> 00:00:07.000\n\n"
+        "00:00:08.000 --> 00:00:09.000\nlast cue without a trailing newline"
+    ),
+    "crlf": "WEBVTT\r\n\r\n00:00:01.000 --> 00:00:02.000\r\nWindows line ends\r\n\r\n",
+}
+
+XML_DOCS = {
+    "srv3": (
+        '<?xml version="1.0" encoding="utf-8" ?><timedtext format="3"><body>'
+        '<p t="1000" d="2500" w="1"><s ac="0">naïve</s><s t="400"> 日本語</s></p>'
+        '<p t="3500" d="2000">a<br/>b &amp; c</p>'
+        '<p t="6000" d="10"> </p>'
+        "</body></timedtext>"
+    ),
+    "srv1": (
+        '<?xml version="1.0" encoding="utf-8" ?><transcript>'
+        '<text start="1.5" dur="2.25">Tom &amp;amp; Jerry&amp;#39;s தமிழ்</text>'
+        "</transcript>"
+    ),
+    "ttml": (
+        '<?xml version="1.0" encoding="utf-8" ?><tt xmlns="http://www.w3.org/ns/ttml"><body><div>'
+        '<p begin="00:00:01.000" end="00:00:02.500">First 😀</p>'
+        '<p begin="2.5s" dur="1500ms">Second</p>'
+        "</div></body></tt>"
+    ),
+}
+
+XML_EXPECTED = {
+    "srv3": [
+        {"startMs": 1000, "endMs": 3500, "text": "naïve 日本語"},
+        {"startMs": 3500, "endMs": 5500, "text": "a b & c"},
+    ],
+    "srv1": [{"startMs": 1500, "endMs": 3750, "text": "Tom & Jerry's தமிழ்"}],
+    "ttml": [
+        {"startMs": 1000, "endMs": 2500, "text": "First 😀"},
+        {"startMs": 2500, "endMs": 4000, "text": "Second"},
+    ],
+}
+
+
+def chunkings(doc):
+    """The same document as a str, as bytes, in fixed-size byte chunks and split at every byte."""
+    data = doc.encode("utf-8")
+    yield "str", (doc,)
+    yield "bytes", (data,)
+    for size in (1, 3, 7, 64):
+        yield f"{size}-byte chunks", [data[i:i + size] for i in range(0, len(data), size)]
+    for cut in range(1, len(data)):
+        yield f"split at {cut}", (data[:cut], data[cut:])
+
+
+def parse(chunks):
+    return list(server.iter_caption_segments(iter(chunks)))
+
+
+@pytest.mark.parametrize("name", sorted(JSON3_DOCS) + sorted(VTT_DOCS))
+def test_matches_old_parser_for_any_chunking(name):
+    doc = JSON3_DOCS.get(name) or VTT_DOCS[name]
+    expected = old_parse_caption_content(doc)
+    assert expected
+    for label, chunks in chunkings(doc):
+        assert parse(chunks) == expected, label
+
+
+def test_fixtures_cover_the_risky_splits():
+    # A split inside a multi-byte character and inside a JSON escape must both occur
+    data = JSON3_DOCS["compact"].encode("utf-8")
+    assert any(byte >= 0x80 for byte in data)
+    assert b'\\"' in data and b"\\\\" in JSON3_DOCS["compact"].encode("utf-8")
+    assert b"\\u" in JSON3_DOCS["ascii"].encode("utf-8")
+
+
+@pytest.mark.parametrize("name", sorted(XML_DOCS))
+def test_xml_formats_for_any_chunking(name):
+    for label, chunks in chunkings(XML_DOCS[name]):
+        assert parse(chunks) == XML_EXPECTED[name], label
+
+
+def test_byte_order_mark_and_leading_blank_chunks():
+    doc = JSON3_DOCS["compact"].encode("utf-8")
+    expected = old_parse_caption_content(JSON3_DOCS["compact"])
+    assert parse([b"", b"\xef\xbb", b"\xbf  \n", doc]) == expected
+
+
+def test_truncated_input_keeps_the_complete_segments():
+    doc = JSON3_DOCS["compact"]
+    cut = doc.index('"tStartMs":5500')
+    segments = parse([doc[:cut].encode("utf-8")])
+    assert [s["startMs"] for s in segments] == [1000, 3500]
+
+
+def test_segment_store_round_trips():
+    rows = old_parse_caption_content(JSON3_DOCS["compact"])
+    store = server.SegmentStore.from_segments(rows)
+    assert len(store) == len(rows)
+    assert store.to_rows() == rows
+    assert server.SegmentStore.from_segments(store) is store
+    columns = store.to_columns()
+    assert columns["startMs"] == [r["startMs"] for r in rows]
+    assert server.SegmentStore.from_segments(json.loads(json.dumps(columns))).to_rows() == rows
+
+
+def test_segment_store_binary_layout():
+    rows = [{"startMs": 0, "endMs": 1500, "text": "naïve"}, {"startMs": 2 ** 40, "endMs": 2 ** 40 + 1, "text": ""}]
+    data = server.SegmentStore.from_segments(rows).to_binary()
+    (count,) = struct.unpack_from("<I", data, 0)
+    starts = struct.unpack_from(f"<{count}q", data, 4)
+    ends = struct.unpack_from(f"<{count}q", data, 4 + 8 * count)
+    offset = 4 + 16 * count
+    texts = []
+    for _ in range(count):
+        (length,) = struct.unpack_from("<I", data, offset)
+        texts.append(data[offset + 4:offset + 4 + length].decode("utf-8"))
+        offset += 4 + length
+    assert offset == len(data)
+    assert [{"startMs": s, "endMs": e, "text": t} for s, e, t in zip(starts, ends, texts)] == rows
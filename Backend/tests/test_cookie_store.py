@@ -0,0 +1,72 @@
+"""Shared cookie store tests: version ordering and tombstone purging."""
+
+import http.cookiejar
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("VOXTEXT_CACHE_DIR", tempfile.mkdtemp(prefix="voxtext-test-"))
+os.environ.setdefault("VOXTEXT_YTDL_PREWARM", "0")
+
+import server  # noqa: E402
+
+
+def make_cookie(name, value="v", expires=None):
+    return http.cookiejar.Cookie(
+        version=0, name=name, value=value, port=None, port_specified=False,
+        domain=".youtube.com", domain_specified=True, domain_initial_dot=True,
+        path="/", path_specified=True, secure=True, expires=expires, discard=expires is None,
+        comment=None, comment_url=None, rest={},
+    )
+
+
+def key(name):
+    return (".youtube.com", "/", name)
+
+
+@pytest.fixture
+def store(tmp_path):
+    def make(tombstone_ttl=60):
+        return server._CookieStore(str(tmp_path / "cache.sqlite3"), tombstone_ttl)
+    return make
+
+
+def test_versions_keep_increasing_after_newest_rows_expire(store):
+    s = store()
+    s.write({key("a"): make_cookie("a")}, "w1")
+    s.write({key("b"): make_cookie("b", expires=int(time.time()) + 1)}, "w1")
+    _, seen = s.changes_since(0)
+    time.sleep(1.1)
+    # Purges the expired newest row; the next version must still be past `seen`
+    s.write({key("c"): make_cookie("c")}, "w2")
+    rows, latest = s.changes_since(seen)
+    assert [row[2] for row in rows] == ["c"]
+    assert latest > seen
+
+
+def test_tombstones_are_purged_after_their_ttl(store):
+    s = store(tombstone_ttl=1)
+    s.write({key("a"): make_cookie("a")}, "w1")
+    s.write({key("a"): None}, "w1")
+    rows, _ = s.changes_since(0)
+    assert [(row[2], row[3]) for row in rows] == [("a", None)]
+    time.sleep(1.1)
+    s.write({key("b"): make_cookie("b")}, "w1")
+    rows, _ = s.changes_since(0)
+    assert [row[2] for row in rows] == ["b"]
+
+
+def test_counter_starts_after_existing_rows(store, tmp_path):
+    s = store()
+    s.write({key("a"): make_cookie("a"), key("b"): make_cookie("b")}, "w1")
+    conn = s._conn()
+    conn.execute("DELETE FROM cookie_meta")
+    # A store opened on a file written before the counter existed
+    reopened = server._CookieStore(str(tmp_path / "cache.sqlite3"), 60)
+    reopened.write({key("c"): make_cookie("c")}, "w2")
+    rows, latest = reopened.changes_since(2)
+    assert [row[2] for row in rows] == ["c"] and latest == 3
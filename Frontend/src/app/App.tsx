@@ -145,7 +145,7 @@ export default function App() {
   const [transcriptSegments, setTranscriptSegments] = useState<Array<{startMs: number; endMs: number; text: string}> | null>(_saved?.transcriptSegments || null);
   const [transcriptError, setTranscriptError] = useState('');
   const [translateProgress, setTranslateProgress] = useState(0);
-  const [formatSizes, setFormatSizes] = useState<Record<string, {sizeMB: number; available: boolean; overLimit: boolean; maxMinutes: number}> | null>(null);
+  const [formatSizes, setFormatSizes] = useState<Record<string, {sizeMB: number; available: boolean; overLimit: boolean; maxMinutes: number; format?: string}> | null>(null);
   const [formatsLoading, setFormatsLoading] = useState(false);
   const [downloadingQuality, setDownloadingQuality] = useState<string | null>(null);
   const [downloadProgress, setDownloadProgress] = useState(0);
@@ -1397,7 +1397,9 @@ export default function App() {
 
       const blob = await resp.blob();
       const contentDisposition = resp.headers.get('Content-Disposition');
-      let filename = `video.${quality === 'Audio Only' ? 'mp3' : 'mp4'}`;
+      // The Audio Only extension depends on the variant served (m4a, opus or mp3)
+      const audioFormat = formatSizes?.['Audio Only']?.format;
+      let filename = quality === 'Audio Only' ? (audioFormat ? `audio.${audioFormat}` : 'audio') : 'video.mp4';
       if (contentDisposition) {
         const match = contentDisposition.match(/filename\*?=(?:UTF-8''|"?)([^";]+)/i);
         if (match) filename = decodeURIComponent(match[1].replace(/"/g, ''));
@@ -1964,7 +1966,7 @@ export default function App() {
                                         }`}></div>
                                         <div>
                                           <p className="text-white text-sm font-semibold text-left">
-                                            {quality} ({quality === 'Audio Only' ? 'MP3' : 'MP4'}){' '}
+                                            {quality} ({quality === 'Audio Only' ? (fmt?.format?.toUpperCase() ?? 'Audio') : 'MP4'}){' '}
                                             {!isUnavailable && !isOverLimit && fmt && fmt.sizeMB > 0 && (
                                               <span className="text-white/50 font-mono font-normal">~{fmt.sizeMB} MB</span>
                                             )}